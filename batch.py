@@ -0,0 +1,67 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Batch evaluation script
+"""
+
+import argparse
+import sys
+
+from core.automata import Automata
+from core.batch import BatchEvaluator
+
+def main():
+    """ Parse the arguments and evaluate the lines of the files """
+
+    parser = argparse.ArgumentParser(description="Evaluate every line of big files "
+                                                 "with one automata over many processes")
+    parser.add_argument("automata", help="automata file (JSON or binary)")
+    parser.add_argument("inputs", nargs="+", help="files with one string by line")
+    parser.add_argument("--workers", type=int, help="number of processes (default the cores)")
+    parser.add_argument("--chunk-bytes", type=int, default=1 << 20,
+                        help="bytes of the input by task")
+    parser.add_argument("--output", help="save one line with 1 or 0 for every input line")
+    parser.add_argument("--matches", action="store_true", help="print the lines accepted")
+    args = parser.parse_args()
+
+    automata = Automata()
+    automata.from_filename(args.automata)
+
+    output = open(args.output, "w") if args.output else None
+    lines = None
+    if args.matches:
+        lines = (line for filename in args.inputs
+                 for line in BatchEvaluator.read_lines(filename))
+
+    total = 0
+    accepted = 0
+    try:
+        with BatchEvaluator(automata, args.workers, chunk_bytes=args.chunk_bytes) as batch:
+            for result in batch.iterate_files(args.inputs):
+                total += 1
+                accepted += result
+                if output is not None:
+                    output.write("1\n" if result else "0\n")
+                if lines is not None:
+                    line = next(lines)
+                    if result:
+                        print(line)
+            stats = batch.get_stats()
+            elapsed = batch.get_elapsed()
+    finally:
+        if output is not None:
+            output.close()
+        if lines is not None:
+            lines.close()
+
+    sys.stderr.write("{0} lines, {1} accepted in {2:.3f} s ({3:.0f} lines/s)\n".format(
+        total, accepted, elapsed, total / elapsed if elapsed else 0.0))
+    for pid, one_stats in sorted(stats.items()):
+        sys.stderr.write("worker {0}: {chunks} chunks, {strings} lines, {chars} chars, "
+                         "{seconds:.3f} s busy ({strings_per_second:.0f} lines/s)\n"
+                         .format(pid, **one_stats))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
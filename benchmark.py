@@ -0,0 +1,328 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark script
+"""
+
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+
+from core.automata import Automata
+from core.families import Families
+from core.lexer import Lexer
+
+class Case:
+    """
+    Inputs of one family and size, built before the operations are timed
+    """
+
+    def __init__(self, family, size, density, epsilon_ratio):
+        """ Constructor """
+        self.family = family
+        self.size = size
+        self.exp = None
+
+        if family == "random":
+            self.automata = Families.random_nfa(size, density=density,
+                                                epsilon_ratio=epsilon_ratio, seed=size)
+        else:
+            self.exp = getattr(Families, family)(size)
+            self.automata = Automata.read_expresion(self.exp)
+
+        self.deterministic = self.automata.to_deterministic()
+        self.strings = Families.strings("ab", 200, 32, seed=size)
+
+        self.text = "".join(self.strings)
+        self.__lexer = None
+
+    @property
+    def lexer(self):
+        """
+        Getter, Lexer of the automata built on the first use, so it is only
+        built by the lexer operation. The build is inside the first timed
+        run, the best of the repeated runs does not include it
+        """
+        if self.__lexer is None:
+            # One char rule after the automata so the lexer never fails
+            self.__lexer = Lexer([("automata", self.automata), ("char", "a+b")])
+        return self.__lexer
+
+
+class Benchmark:
+    """
+    Time every public operation over generated families of automatas
+    Every (family, operation, size) is timed repeat times and keeps the best
+    time, the peak memory is measured in one more run with tracemalloc.
+    The bigger sizes of one operation are skipped when its last time, or
+    the time of the next size extrapolated from the growth of the last two
+    sizes, is more than limit seconds
+    """
+
+    FAMILIES = {
+        "random": [8, 16, 32, 64],
+        "blowup": [2, 4, 6, 8, 10],
+        "chain": [16, 64, 256, 1024],
+        "nesting": [4, 8, 16, 32]
+    }
+
+    # State elimination builds expresions that grow exponentially over these
+    # families, the bigger sizes run out of memory before the time limit
+    MAXIMUM_SIZES = {
+        ("random", "generate_expresion"): 32,
+        ("nesting", "generate_expresion"): 8
+    }
+
+    OPERATIONS = {
+        "read_expresion": lambda case: Automata.read_expresion(case.exp),
+        "to_deterministic": lambda case: case.automata.to_deterministic(),
+        "minimizete": lambda case: case.deterministic.minimizete(),
+        "union": lambda case: Automata.merge_automata(case.automata, case.deterministic, "union"),
+        "intersection": lambda case: Automata.merge_automata(case.automata, case.deterministic,
+                                                             "intersection"),
+        "equiv": lambda case: Automata.merge_automata(case.automata, case.deterministic, "equiv"),
+        "concatenation": lambda case: Automata.concatenation(case.automata, case.automata),
+        "kleen_star": lambda case: case.automata.kleen_star(),
+        "generate_expresion": lambda case: case.automata.generate_expresion(),
+        "evaluate": lambda case: sum(case.automata.evaluate(one_string)
+                                     for one_string in case.strings),
+        "lexer": lambda case: sum(1 for _ in case.lexer.tokenize(case.text))
+    }
+
+    def __init__(self, repeat=3, limit=10.0, memory=True, density=0.3, epsilon_ratio=0.1):
+        """ Constructor """
+        self.__repeat = max(1, repeat)
+        self.__limit = limit
+        self.__memory = memory
+        self.__density = density
+        self.__epsilon_ratio = epsilon_ratio
+
+    @staticmethod
+    def describe(result):
+        """ Return one number that describes the result of one operation """
+        if isinstance(result, Automata):
+            return len(set(result.to_numbers()[1]))
+        if isinstance(result, str):
+            return len(result)
+        return result
+
+    def measure(self, operation, case):
+        """ Return (seconds, peak_bytes, result) of one operation over one case """
+
+        function = Benchmark.OPERATIONS[operation]
+        best = None
+        result = None
+        for _ in range(self.__repeat):
+            start = time.perf_counter()
+            result = function(case)
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+
+        peak = None
+        if self.__memory:
+            tracemalloc.start()
+            try:
+                function(case)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        return best, peak, Benchmark.describe(result)
+
+    def run(self, families=None, operations=None, sizes=None, callback=None):
+        """
+        Run the benchmark and return one dict with the meta data, the results
+        and the scaling curves, callback receive every result when is ready
+        """
+
+        families = families or sorted(Benchmark.FAMILIES)
+        operations = operations or sorted(Benchmark.OPERATIONS)
+        results = []
+
+        for family in families:
+            skipped = set()
+            previous = {}
+            for size in sizes or Benchmark.FAMILIES[family]:
+                case = Case(family, size, self.__density, self.__epsilon_ratio)
+                for operation in operations:
+                    if operation in skipped:
+                        continue
+                    if operation == "read_expresion" and case.exp is None:
+                        continue
+                    if size > Benchmark.MAXIMUM_SIZES.get((family, operation), size):
+                        continue
+
+                    seconds, peak, result = self.measure(operation, case)
+                    entry = {
+                        "family": family,
+                        "operation": operation,
+                        "size": size,
+                        "seconds": seconds,
+                        "peak_bytes": peak,
+                        "result": result
+                    }
+                    results.append(entry)
+                    if callback is not None:
+                        callback(entry)
+                    growth = seconds / previous[operation] if previous.get(operation) else 1.0
+                    if seconds * max(growth, 1.0) > self.__limit:
+                        skipped.add(operation)
+                    previous[operation] = seconds
+
+        return {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": self.__repeat,
+                "density": self.__density,
+                "epsilon_ratio": self.__epsilon_ratio,
+                "date": time.strftime("%Y-%m-%dT%H:%M:%S")
+            },
+            "results": results,
+            "curves": Benchmark.curves(results)
+        }
+
+    @staticmethod
+    def curves(results):
+        """
+        Group the results by (family, operation) and fit the exponent k of
+        seconds ~ size^k with least squares over the logarithms
+        """
+
+        groups = {}
+        for entry in results:
+            groups.setdefault((entry["family"], entry["operation"]), []).append(entry)
+
+        curves = []
+        for (family, operation), entries in sorted(groups.items()):
+            points = [(math.log(x["size"]), math.log(x["seconds"]))
+                      for x in entries if x["seconds"] > 0 and x["size"] > 0]
+            exponent = None
+            if len(points) > 1:
+                mean_x = sum(x for x, _ in points) / len(points)
+                mean_y = sum(y for _, y in points) / len(points)
+                variance = sum((x - mean_x) ** 2 for x, _ in points)
+                if variance > 0:
+                    exponent = sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+            curves.append({
+                "family": family,
+                "operation": operation,
+                "sizes": [x["size"] for x in entries],
+                "seconds": [x["seconds"] for x in entries],
+                "exponent": exponent
+            })
+        return curves
+
+    @staticmethod
+    def compare(report, baseline, tolerance=1.5, minimum=0.001):
+        """
+        Return the list of regressions of report against baseline, one
+        result is one regression when its time or its peak memory is more
+        than tolerance times the baseline (times under minimum are ignored)
+        """
+
+        saved = {}
+        for entry in baseline["results"]:
+            saved[(entry["family"], entry["operation"], entry["size"])] = entry
+
+        regressions = []
+        for entry in report["results"]:
+            old = saved.get((entry["family"], entry["operation"], entry["size"]))
+            if old is None:
+                continue
+
+            for key, floor in [("seconds", minimum), ("peak_bytes", 65536)]:
+                if entry[key] is None or not old.get(key):
+                    continue
+                ratio = entry[key] / float(old[key])
+                if ratio > tolerance and entry[key] > floor:
+                    regressions.append({
+                        "family": entry["family"],
+                        "operation": entry["operation"],
+                        "size": entry["size"],
+                        "metric": key,
+                        "baseline": old[key],
+                        "actual": entry[key],
+                        "ratio": ratio
+                    })
+
+        return regressions
+
+
+def print_entry(entry):
+    """ Print one result as one row of the table """
+    peak = "-" if entry["peak_bytes"] is None else "{0:.1f}".format(entry["peak_bytes"] / 1024.0)
+    print("{0:<8} {1:<18} {2:>6} {3:>12.6f} {4:>12} {5:>10}".format(
+        entry["family"], entry["operation"], entry["size"], entry["seconds"], peak,
+        entry["result"]))
+    sys.stdout.flush()
+
+def main():
+    """ Parse the arguments and run the benchmark """
+
+    parser = argparse.ArgumentParser(description="Benchmark of the automata operations")
+    parser.add_argument("--family", action="append", choices=sorted(Benchmark.FAMILIES),
+                        help="family to run, can be repeated (default all)")
+    parser.add_argument("--operation", action="append", choices=sorted(Benchmark.OPERATIONS),
+                        help="operation to run, can be repeated (default all)")
+    parser.add_argument("--sizes", help="comma separated sizes, replace the sizes of every family")
+    parser.add_argument("--repeat", type=int, default=3, help="runs by result, keep the best")
+    parser.add_argument("--limit", type=float, default=10.0,
+                        help="seconds of one operation to skip its bigger sizes")
+    parser.add_argument("--density", type=float, default=0.3, help="density of the random NFAs")
+    parser.add_argument("--epsilon", type=float, default=0.1,
+                        help="epsilon ratio of the random NFAs")
+    parser.add_argument("--no-memory", action="store_true", help="do not measure the peak memory")
+    parser.add_argument("--output", help="save the JSON report on this file")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="max ratio against the baseline before one regression")
+    parser.add_argument("--json", action="store_true", help="print the JSON report")
+    args = parser.parse_args()
+
+    sizes = None
+    if args.sizes:
+        sizes = [int(size) for size in args.sizes.split(",")]
+
+    benchmark = Benchmark(args.repeat, args.limit, not args.no_memory,
+                          args.density, args.epsilon)
+
+    callback = None
+    if not args.json:
+        print("{0:<8} {1:<18} {2:>6} {3:>12} {4:>12} {5:>10}".format(
+            "family", "operation", "size", "seconds", "peak KiB", "result"))
+        callback = print_entry
+
+    report = benchmark.run(args.family, args.operation, sizes, callback)
+
+    if args.output:
+        with open(args.output, "w") as filex:
+            json.dump(report, filex, indent=4, sort_keys=True)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as filex:
+            regressions = Benchmark.compare(report, json.load(filex), args.tolerance)
+        report["regressions"] = regressions
+
+    if args.json:
+        print(json.dumps(report, indent=4, sort_keys=True))
+    else:
+        print("")
+        for curve in report["curves"]:
+            exponent = "-" if curve["exponent"] is None else "{0:.2f}".format(curve["exponent"])
+            print("{0:<8} {1:<18} exponent {2}".format(curve["family"], curve["operation"],
+                                                       exponent))
+        for regression in regressions:
+            print("REGRESSION {family} {operation} {size} {metric}: "
+                  "{baseline} -> {actual} ({ratio:.2f}x)".format(**regression))
+
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,24 @@
 """ File for Automata Class """
 
 import json
+from collections import deque
 from core.transition import Transition
+from core.transition_list import TransitionList
+from core.matcher import Matcher
+from core.simulation import SetSimulation
+from core.bitset import BitSimulation
+from core.hopcroft import Hopcroft
+from core.lazy import LazyDFA
+from core.closure import EpsilonClosure
+from core.thompson import Thompson
+from core.equivalence import Equivalence
+from core.product import Product
+from core.cursor import Cursor
+from core.search import Searcher
+from core.binary import BinaryAutomata
+from core.json_stream import JsonStream
+from core.symbol_table import SymbolTable
+from core.instrumentation import Instrumentation
 
 class Automata:
     """ Class Automata """
@@ -12,60 +29,128 @@ class Automata:
         """ Constructor """
         self.__alphabet = []
         self.__states = []
-        self.__transitions = []
+        self.__transitions = TransitionList()
         self.__initial = ""
         self.__aceptation = []
+        self.__closures = None
+        self.__matcher = None
+        self.__lazy = None
+        self.__numbered = None
 
     def init(self):
         """ Clean all the object """
         self.__alphabet = []
         self.__states = []
-        self.__transitions = []
+        self.__transitions = TransitionList()
         self.__initial = ""
         self.__aceptation = []
+        self.__closures = None
+        self.__matcher = None
+        self.__lazy = None
+        self.__numbered = None
 
     def get_alphabet(self):
         """ Getter """
+        self.__materialize()
         return self.__alphabet
 
     def set_alphabet(self, one_list):
         """ Setter """
+        self.__materialize()
         self.__alphabet = one_list
 
     def get_states(self):
         """ Getter """
+        self.__materialize()
         return self.__states
 
     def set_states(self, one_list):
         """ Setter """
+        self.__materialize()
         self.__states = one_list
 
     def get_transitions(self):
         """ Getter """
+        self.__materialize()
         return self.__transitions
 
     def set_transitions(self, one_list):
         """ Setter """
+        self.__materialize()
+        if not isinstance(one_list, TransitionList):
+            one_list = TransitionList(one_list)
         self.__transitions = one_list
 
     def get_initial(self):
         """ Getter """
+        self.__materialize()
         return self.__initial
 
     def set_initial(self, one_string):
         """ Setter """
+        self.__materialize()
         self.__initial = one_string
 
     def get_aceptation(self):
         """ Getter """
+        self.__materialize()
         return self.__aceptation
 
     def set_aceptation(self, one_list):
         """ Setter """
+        self.__materialize()
         self.__aceptation = one_list
 
+    def from_numbers(self, transitions, states, alphabet, initial, aceptation, clean=True):
+        """
+        Load one automata given by numbers, the states, initial and aceptation
+        are numbers of the states table of the transitions and the alphabet
+        numbers of its tokens table. The names are only created when one
+        getter needs them, then the automata is cleaned like clean() does
+        when clean is True
+        """
+        self.init()
+        self.__transitions = transitions
+        self.__numbered = (list(states), list(alphabet), initial, list(aceptation), clean)
+
+    def to_numbers(self):
+        """
+        Return (transitions, states, alphabet, initial, aceptation) with the
+        numbers of the symbol tables of the transitions, without create names
+        """
+
+        if self.__numbered is not None:
+            states, alphabet, initial, aceptation, _ = self.__numbered
+            return (self.__transitions, states, alphabet, initial, aceptation)
+
+        table = self.__transitions.get_states_table()
+        tokens = self.__transitions.get_tokens_table()
+        return (self.__transitions,
+                [table.number(state) for state in self.__states],
+                [tokens.number(token) for token in self.__alphabet],
+                table.number(self.__initial),
+                [table.number(state) for state in self.__aceptation])
+
+    def __materialize(self):
+        """ Create the names of one automata loaded by from_numbers """
+
+        if self.__numbered is None:
+            return
+
+        states, alphabet, initial, aceptation, clean = self.__numbered
+        self.__numbered = None
+        table = self.__transitions.get_states_table()
+        tokens = self.__transitions.get_tokens_table()
+        self.__states = [table.name(state) for state in states]
+        self.__alphabet = [tokens.name(token) for token in alphabet]
+        self.__initial = table.name(initial)
+        self.__aceptation = [table.name(state) for state in aceptation]
+        if clean:
+            self.clean()
+
     def to_json(self):
         """ To JSON """
+        self.__materialize()
         _dict = {}
         _dict['alphabet'] = self.__alphabet
         _dict['states'] = self.__states
@@ -75,10 +160,34 @@ class Automata:
         return _dict
 
     def to_file(self, filename):
-        """ Create a File with the automata """
+        """
+        Create a File with the automata, the output is the same of json.dump
+        with indent=4 and sort_keys but the transitions are written one by one
+        """
+
+        def dumps(value, level):
+            text = json.dumps(value, indent=4, sort_keys=True)
+            return text.replace("\n", "\n" + "    " * level)
+
+        self.__materialize()
         with open(filename, "w") as filex:
-            _json = self.to_json()
-            json.dump(_json, filex, indent=4, sort_keys=True)
+            filex.write("{\n")
+            for key, value in [("aceptation", self.__aceptation),
+                               ("alphabet", self.__alphabet),
+                               ("initial", self.__initial),
+                               ("states", self.__states)]:
+                filex.write('    "{0}": {1},\n'.format(key, dumps(value, 1)))
+
+            if not self.__transitions:
+                filex.write('    "transitions": []\n}')
+                return
+
+            filex.write('    "transitions": [\n')
+            separator = ""
+            for trans in self.__transitions:
+                filex.write(separator + "        " + dumps(trans.to_json(), 2))
+                separator = ",\n"
+            filex.write("\n    ]\n}")
 
     def from_json(self, one_jsonx):
         """ From JSON """
@@ -89,48 +198,155 @@ class Automata:
             one_json = json.loads(one_jsonx)
 
         if 'alphabet' in one_json.keys():
-            self.__alphabet = one_json['alphabet']
+            self.__alphabet = list(one_json['alphabet'])
 
         if 'states' in one_json.keys():
-            self.__states = one_json['states']
+            self.__states = list(one_json['states'])
 
         if 'transitions' in one_json.keys():
             transitions = one_json['transitions']
             for trans in transitions:
-                new_trans = Transition()
-                new_trans.from_json(trans)
-                self.__transitions.append(new_trans)
+                self.__transitions.append(Transition.from_json(trans))
 
         if 'initial' in one_json.keys():
             self.__initial = one_json['initial']
 
         if 'aceptation' in one_json.keys():
-            self.__aceptation = one_json['aceptation']
+            self.__aceptation = list(one_json['aceptation'])
+
+    def to_binary(self, filename, table=False):
+        """
+        Create a binary file with the automata, see BinaryAutomata
+        With table=True the file also keeps the table of the compiled matcher
+        """
+        BinaryAutomata.write(self, filename, table)
+
+    def from_binary(self, filename):
+        """
+        Load one automata from one binary file without copy the transitions,
+        the list reads the mapped file until its first change (copy on write)
+        and the names are only decoded when one getter needs them
+        """
+
+        binary = BinaryAutomata(filename)
+        states = SymbolTable()
+        states.defer(binary.get_string_count(), binary.get_strings)
+        tokens = SymbolTable()
+        tokens.defer(binary.get_string_count(), binary.get_strings)
+        transitions = TransitionList.from_columns(binary.get_transition_numbers(), states, tokens)
+        self.from_numbers(transitions, binary.get_state_numbers(), binary.get_alphabet_numbers(),
+                          binary.get_initial_number(), binary.get_aceptation_numbers(), False)
+
+    def from_filename(self, filename, progress=None, validate=False):
+        """
+        Load one automata from file, JSON or binary
+        The JSON is read as one stream, one transition at a time, and the
+        names are shared between the transitions. The progress callback
+        receive (bytes_read, total_bytes, transitions) while loading and with
+        validate=True every transition must use known states and tokens
+        """
+
+        if BinaryAutomata.is_binary(filename):
+            self.from_binary(filename)
+            return
+
+        self.init()
+        names = {}
+
+        def intern(one_string):
+            return names.setdefault(one_string, one_string)
+
+        def check(trans, number):
+            for state in [trans.get_state_from(), trans.get_state_to()]:
+                if state not in states:
+                    raise ValueError("Transition {0} uses the unknown state '{1}'"
+                                     .format(number, state))
+            if trans.get_token() != "" and trans.get_token() not in alphabet:
+                raise ValueError("Transition {0} uses the unknown token '{1}'"
+                                 .format(number, trans.get_token()))
+
+        with open(filename, "rb") as filex:
+            stream = JsonStream(filex)
+            states = None
+            alphabet = None
+            pending = False
+
+            for key in stream.iterate_object():
+                if key == "transitions":
+                    for number, one_json in enumerate(stream.iterate_array()):
+                        new_trans = Transition(intern(one_json.get("state_from", "")),
+                                               intern(one_json.get("token", "")),
+                                               intern(one_json.get("state_to", "")))
+                        self.__transitions.append(new_trans)
+                        if validate and states is not None and alphabet is not None:
+                            check(new_trans, number)
+                        elif validate:
+                            pending = True
+                        if progress is not None and number % 4096 == 0:
+                            progress(stream.get_bytes_read(), stream.get_size(), number)
+
+                elif key in ["alphabet", "states", "aceptation"]:
+                    values = [intern(value) for value in stream.iterate_array()]
+                    if key == "alphabet":
+                        self.__alphabet = values
+                        alphabet = set(values)
+                    elif key == "states":
+                        self.__states = values
+                        states = set(values)
+                    else:
+                        self.__aceptation = values
 
-    def from_filename(self, filename):
-        """ Load one automata from file """
-        with open(filename) as filex:
-            _json = json.loads(filex.read())
-            self.from_json(_json)
+                elif key == "initial":
+                    self.__initial = intern(stream.value())
+
+                else:
+                    stream.value()
+
+            if progress is not None:
+                progress(stream.get_bytes_read(), stream.get_size(), len(self.__transitions))
+
+        if validate:
+            states = set(self.__states)
+            alphabet = set(self.__alphabet)
+            if pending:
+                for number, trans in enumerate(self.__transitions):
+                    check(trans, number)
+            for state in [self.__initial] + self.__aceptation:
+                if state not in states:
+                    raise ValueError("Unknown state '{0}' in initial or aceptation".format(state))
 
     def console_print(self):
         """ Print in console """
         print(json.dumps(self.to_json(), indent=4, sort_keys=True))
 
     def copy(self):
-        """ Create one new automata from the original """
+        """
+        Create one new automata from the original, both automatas share the
+        transitions until one of them changes (copy on write)
+        """
         auto = Automata()
-        j = self.to_json()
-        auto.from_json(j)
+        transitions = self.__transitions.copy()
+        if self.__numbered is not None:
+            states, alphabet, initial, aceptation, clean = self.__numbered
+            auto.from_numbers(transitions, states, alphabet, initial, aceptation, clean)
+            return auto
+
+        auto.__transitions = transitions
+        auto.__alphabet = list(self.__alphabet)
+        auto.__states = list(self.__states)
+        auto.__initial = self.__initial
+        auto.__aceptation = list(self.__aceptation)
         return auto
 
     def build_alphabet(self):
         """ Build the alphabet of the automata reading the transitions """
+        self.__materialize()
         self.__alphabet = sorted(list(set(map(lambda x: x.get_token(), self.__transitions))))
 
     def build_states(self):
-        """ Build the states of the automata reading the transitions """
-        self.__states = []
+        """ Build the states of the automata reading the transitions and the initial """
+        self.__materialize()
+        self.__states = [self.__initial] if self.__initial else []
         for trans in self.__transitions:
             self.__states.append(trans.get_state_from())
             self.__states.append(trans.get_state_to())
@@ -170,26 +386,34 @@ class Automata:
 
         self.do_name_mapping(str_replace)
 
-    def fetch_transition(self, state_from=None, token=None, state_to=None):
-        """ Fetch a list of transitions passing the state_from, token or state_to """
-
-        transitions = []
-        for transition in self.__transitions:
-
-            found = 0
-            if state_from is None or transition.get_state_from() == state_from:
-                found += 1
-
-            if token is None or transition.get_token() == token:
-                found += 1
+    @staticmethod
+    def unique_names(names):
+        """
+        Return the names cleaned like clean() does, the names repeated after
+        the cleaning get one suffix with its position
+        """
 
-            if state_to is None or transition.get_state_to() == state_to:
-                found += 1
+        seen = set()
+        new_names = []
+        for i, name in enumerate(names):
+            new_name = "empty"
+            if name != "":
+                new_name = name.replace(",", "_").replace(".", "_")
+            while new_name in seen:
+                new_name = "{0}_{1}".format(new_name, i)
+            seen.add(new_name)
+            new_names.append(new_name)
+        return new_names
 
-            if found == 3:
-                transitions.append(transition)
+    def fetch_transition(self, state_from=None, token=None, state_to=None):
+        """ Fetch a list of transitions passing the state_from, token or state_to """
 
-        return transitions
+        self.__materialize()
+        found = self.__transitions.fetch(state_from, token, state_to)
+        if Instrumentation.ACTIVE:
+            Instrumentation.count("fetch_transition/calls")
+            Instrumentation.count("fetch_transition/transitions", len(found))
+        return found
 
     def do_name_mapping(self, callback):
         """
@@ -197,22 +421,40 @@ class Automata:
         The callback receive the old name of the state and return the new name
         """
 
+        self.__materialize()
         self.build_alphabet()
         self.build_states()
 
         self.__states = list(map(callback, self.__states))
         self.__initial = callback(self.__initial)
         self.__aceptation = list(map(callback, self.__aceptation))
-        self.__transitions = list(map(lambda x: x.replace_name(callback), self.__transitions))
-        self.__transitions.sort(key=lambda x: x.sort_str(), reverse=False)
+        transitions = list(map(lambda x: x.replace_name(callback), self.__transitions))
+        transitions.sort(key=lambda x: x.sort_str(), reverse=False)
+        self.__transitions = TransitionList(transitions)
 
     def is_deterministic(self):
         """ Return if the automata is deterministic """
-        return self.get_next_incomplete() is None
+
+        transitions, states, alphabet, _, _ = self.to_numbers()
+        epsilon = transitions.get_tokens_table().find("")
+        expected = set(alphabet)
+        expected.discard(epsilon)
+
+        outgoing = {}
+        for state_from, token, _ in transitions.iterate_numbers():
+            outgoing.setdefault(state_from, []).append(token)
+
+        for state in states:
+            tokens = outgoing.get(state, [])
+            if len(set(tokens)) != len(tokens) or set(tokens) != expected:
+                return False
+        return True
 
     def get_next_incomplete(self):
         """ Get the first state that invalidate the deterministic property """
 
+        self.__materialize()
+
         # iterate over all the states to find the token of every state
         for state in self.__states:
             tokens = []
@@ -231,162 +473,242 @@ class Automata:
 
         return None
 
-    def epsilon_cerradure(self, one_state, cerradure=None, count=0):
-        """ Calculate the cerradure epsilon from one state """
+    def closure_engine(self):
+        """
+        Return the EpsilonClosure of the actual transitions, the states are
+        the numbers of the states table of the transitions
+        The result is cached until the transitions change
+        """
 
-        #Avoid too much recursion
-        if count > len(self.get_states()) * 3:
-            return []
+        transitions = self.__transitions
+        version = transitions.get_version()
+        size = len(transitions.get_states_table())
 
-        new_cerradure = []
+        # The list is compared by identity, its == compares every transition
+        cached = self.__closures
+        if cached is not None and cached[0] is transitions and cached[1:3] == (version, size):
+            return cached[3]
 
-        # calculate cerradure epsilon first time
-        if cerradure is None or one_state not in cerradure:
+        edges = [[] for _ in range(size)]
+        epsilon = transitions.get_tokens_table().find("")
+        if epsilon is not None:
+            for state_from, token, state_to in transitions.iterate_numbers():
+                if token == epsilon:
+                    edges[state_from].append(state_to)
 
-            # base case: ce(x) += [x]
-            new_cerradure.append(one_state)
+        engine = EpsilonClosure(size, edges)
+        self.__closures = (transitions, version, size, engine)
+        return engine
 
-            # recursive case: ce(x) += ce(eval(x, ""))
-            for trans in self.fetch_transition(one_state, ""):
-                if trans.get_state_to() not in new_cerradure:
-                    new_cerradure += self.epsilon_cerradure(trans.get_state_to(), new_cerradure, count+1)
+    def epsilon_closures(self):
+        """ Return one dict with the cerradure epsilon of every state """
 
-        #return final  cerradure
-        return new_cerradure
+        self.__materialize()
+        table = self.__transitions.get_states_table()
+        closure = self.closure_engine()
 
-    def extend_states(self):
-        """ Remove the epsilon transitions and create new transitions """
+        present = set()
+        for state_from, _, state_to in self.__transitions.iterate_numbers():
+            present.add(state_from)
+            present.add(state_to)
 
-        def mini_add(new_transitions, state, token, ext):
-            nt1 = Transition(state, token, ext)
-
-            add = True
-            for nt2 in new_transitions:
-                if nt1.equal_obj(nt2):
-                    add = False
-                    break
+        closures = {}
+        for state in self.__states:
+            closures[state] = [state]
+        for number in sorted(present):
+            state = table.name(number)
+            closures[state] = [state] + [table.name(x) for x in closure.closure(number) if x != number]
+        return closures
 
-            if add:
-                new_transitions.append(nt1)
+    def epsilon_cerradure(self, one_state, cerradure=None, count=0):
+        """
+        Calculate the cerradure epsilon from one state
+        cerradure and count are not used, all the closures are computed at once
+        """
 
-        new_transitions = []
+        self.__materialize()
+        table = self.__transitions.get_states_table()
+        number = table.find(one_state)
+        closure = self.closure_engine()
+        if number is None or number >= closure.get_size():
+            return [one_state]
 
-        # calculate all epsilon cerradure
-        epsilon = {}
-        for state in self.__states:
-            epsilon[state] = self.epsilon_cerradure(state)
+        return [one_state] + [table.name(x) for x in closure.closure(number) if x != number]
 
-        # ce(state) -> eval(ce, token) -> new(from, token, ce(to))
-        for state, cerradure in epsilon.items():
+    def __extended(self):
+        """
+        Return (masks, closure) of the transitions without epsilon of
+        extend_states, masks[(state, token)] is the bitmask of the states
+        reached from state with token through its epsilon cerradure
+        Only the states of the automata get new transitions
+        """
 
-            for token in self.__alphabet:
+        transitions, states, alphabet, _, _ = self.to_numbers()
+        closure = self.closure_engine()
+        with Instrumentation.phase("epsilon_closure"):
+            closed = closure.masks()
+        epsilon = transitions.get_tokens_table().find("")
 
-                # skip epsilon transitions
-                if token == "":
-                    continue
+        # eval(state, token) already closed by epsilon as one bitmask
+        successors = {}
+        for state_from, token, state_to in transitions.iterate_numbers():
+            if token != epsilon:
+                key = (state_from, token)
+                successors[key] = successors.get(key, 0) | closed[state_to]
 
-                posible_add = []
+        alphabet = set(alphabet)
+        following = {}
+        for state_from, token in successors:
+            following.setdefault(state_from, set()).add(token)
 
-                # eval(ce, token)
+        # ce(state) -> eval(ce, token) -> new(from, token, ce(to))
+        masks = {}
+        for state in set(states):
+            if state >= closure.get_size():
+                continue
+            cerradure = closure.closure(state)
+            tokens = set()
+            for ce_state in cerradure:
+                tokens |= following.get(ce_state, set())
+            for token in tokens & alphabet:
+                goes = 0
                 for ce_state in cerradure:
-                    for trans in self.fetch_transition(ce_state, token):
-                        posible_add.append(trans.get_state_to())
+                    goes |= successors.get((ce_state, token), 0)
+                masks[(state, token)] = goes
 
-                # new(from, token, ce(to))
-                for posible_state in posible_add:
+        return masks, closure
 
-                    future = epsilon[posible_state]
+    @Instrumentation.operation
+    def extend_states(self):
+        """ Remove the epsilon transitions and create new transitions """
 
-                    for ext in future:
-                        mini_add(new_transitions, state, token, ext)
+        self.__materialize()
+        table = self.__transitions.get_states_table()
+        tokens = self.__transitions.get_tokens_table()
+        masks, _ = self.__extended()
+
+        new_transitions = []
+        for state in sorted(set(self.__states)):
+            number = table.find(state)
+            for token in self.__alphabet:
+
+                # skip epsilon transitions
+                if token == "" or tokens.find(token) is None:
+                    continue
+
+                goes = masks.get((number, tokens.find(token)), 0)
+                for ext in EpsilonClosure.members(goes):
+                    new_transitions.append(Transition(state, token, table.name(ext)))
 
         # Remove empty string from alphabeth
         if "" in self.__alphabet:
             self.__alphabet.remove("")
 
         # update of transitions
-        self.__transitions = new_transitions
+        self.__transitions = TransitionList(new_transitions)
         self.clean()
 
-
+    @Instrumentation.operation
     def to_deterministic(self):
         """ Return the deterministic automata without change the actual one """
 
-        def calculate_goes(copy_self, current_state):
-            goes_to = {}
-            for goes in current_state.split(","):
-                for token in copy_self.get_alphabet():
-
-                    if token not in goes_to:
-                        goes_to[token] = []
-
-                    for trans in copy_self.fetch_transition(goes, token):
-                        goes_to[token].append(trans.get_state_to())
-
-                    if goes_to[token] == []:
-                        goes_to[token].append("empty")
-            return goes_to
-
         if self.is_deterministic():
             return self.copy()
 
-        if self.get_alphabet() == [""]:
-            return self.copy()
-
-        copy_self = self.copy()
-        copy_self.extend_states()
-
-        new_automata = Automata()
-        new_automata.set_alphabet(list(self.__alphabet))
-        new_automata.set_initial(self.__initial)
-        new_automata.set_states([self.__initial])
-        new_automata.set_transitions([])
-
-        start = True
-        while not new_automata.is_deterministic() or start:
+        transitions, _, _, initial, aceptation = self.to_numbers()
+        table = transitions.get_states_table()
+        tokens = transitions.get_tokens_table()
+        with Instrumentation.phase("extend"):
+            masks, closure = self.__extended()
 
-            current_state = new_automata.get_next_incomplete()
-            start = False
-
-            # Get the states tha goes from the actual node
-            goes_to = calculate_goes(copy_self, current_state)
-
-            # Create the transitions
-            for token, goesx in goes_to.items():
+        # Only the tokens of the transitions without epsilon
+        alphabet = sorted(set(token for (_, token), goes in masks.items() if goes),
+                          key=tokens.name)
 
-                goes = set(goesx)
-                goes = list(goes)
-                goes.sort()
+        # Every set of states is one bitmask with one id, the worklist expands every set once
+        start = 1 << initial
+        ids = {start: 0}
+        sets = [start]
+        worklist = deque([start])
 
-                if goes != ["empty"]:
-                    goes = list(filter(lambda x: x != "empty", goes))
+        new_transitions = []
+        with Instrumentation.phase("subsets"):
+            while worklist:
+                current = worklist.popleft()
+
+                # Get the states tha goes from the actual node and create the transitions
+                for token in alphabet:
+
+                    goes = 0
+                    for state in EpsilonClosure.members(current):
+                        goes |= masks.get((state, token), 0)
+
+                    if goes not in ids:
+                        ids[goes] = len(sets)
+                        sets.append(goes)
+                        worklist.append(goes)
+
+                    new_transitions.append((ids[current], token, ids[goes]))
+
+        # Every set is pushed once to the worklist
+        if Instrumentation.ACTIVE:
+            Instrumentation.count("subset_states", len(sets))
+            Instrumentation.count("worklist_pushes", len(sets))
+            Instrumentation.count("transitions", len(new_transitions))
+
+        def names():
+            def clean_name(number):
+                name = table.name(number)
+                if name == "":
+                    return "empty"
+                return name.replace(",", "_").replace(".", "_")
+
+            new_names = [table.name(initial)]
+            for goes in sets[1:]:
+                if not goes:
+                    new_names.append("empty")
+                else:
+                    new_names.append(",".join(sorted(map(clean_name, EpsilonClosure.members(goes)))))
+            return Automata.unique_names(new_names)
 
-                uid = ",".join(goes)
-                if uid not in new_automata.get_states():
-                    new_automata.get_states().append(uid)
+        new_table = SymbolTable()
+        new_table.defer(len(sets), names)
+        new_tokens = SymbolTable(map(tokens.name, alphabet))
+        numbers = dict((token, i) for i, token in enumerate(alphabet))
 
-                if not new_automata.fetch_transition(current_state, token, uid):
-                    new_t = Transition(current_state, token, uid)
-                    new_automata.get_transitions().append(new_t)
+        new_list = TransitionList(states=new_table, tokens=new_tokens)
+        for state_from, token, state_to in new_transitions:
+            new_list.append_numbers(state_from, numbers[token], state_to)
 
-        # Mark aceptations states
-        for state in new_automata.get_states():
-            for aceptation in copy_self.get_aceptation():
-                if aceptation in state.split(",") and \
-                   aceptation not in new_automata.get_aceptation():
-                    new_automata.get_aceptation().append(state)
+        # Mark aceptations states, the initial set is not closed by epsilon
+        aceptation = sum(1 << state for state in set(aceptation))
+        new_aceptation = [i for i, goes in enumerate(sets) if goes & aceptation]
+        if new_aceptation[:1] != [0] and closure.masks()[initial] & aceptation:
+            new_aceptation.insert(0, 0)
 
-        # Return the clean automata
-        new_automata.clean()
+        new_automata = Automata()
+        # The initial set is one state even without transitions (empty alphabet)
+        new_automata.from_numbers(new_list,
+                                  sorted(set([0] + [x[0] for x in new_transitions])),
+                                  range(len(alphabet)),
+                                  0,
+                                  new_aceptation)
         return new_automata
 
-    def minimizete(self):
+    @Instrumentation.operation
+    def minimizete(self, method="hopcroft"):
         """
         Minimizate the automata without change the original
-        The minimization is done by creating pairs of states and calculate its compatibility
+        hopcroft: partition refinement of the states in O(n log n)
+        pairs: creating pairs of states and calculate its compatibility
         """
 
-        if self.get_alphabet() == [""]:
+        if method not in ["hopcroft", "pairs"]:
+            raise ValueError("method parameter must to be [hopcroft, pairs]")
+
+        transitions, states, alphabet, initial, aceptation = self.to_numbers()
+        tokens = transitions.get_tokens_table()
+        if [tokens.name(token) for token in alphabet] == [""]:
             return self.copy()
 
         if not self.is_deterministic():
@@ -408,9 +730,11 @@ class Automata:
 
             # Iterate until get only find all the incompatibles
             no_compatibles = 1
+            passes = 0
             pairs = dict(original_pairs)
             while no_compatibles != 0:
                 no_compatibles = 0
+                passes += 1
                 for pair, compatible in dict(pairs).items():
 
                     # Find only still comparibles pairs
@@ -430,51 +754,122 @@ class Automata:
                                 pairs[pair] = False
                                 no_compatibles += 1
 
+            if Instrumentation.ACTIVE:
+                Instrumentation.count("pairs", len(pairs))
+
             # Dilter only valid pairs
             pairs = sorted(list(filter(lambda x: pairs[x], pairs.keys())))
             pairs = sorted(list(set(map(lambda x: ",".join(sorted(x.split(","))), pairs))))
 
-            return pairs
+            return pairs, passes
 
         def create_new_state_pairs(pairs):
 
-            # Join into one only state the same pairs
-            new_states = []
+            # Join into one only state the same pairs with one union-find
+            parent = {}
+
+            def find(state):
+                parent.setdefault(state, state)
+                while parent[state] != state:
+                    parent[state] = parent[parent[state]]
+                    state = parent[state]
+                return state
+
             for pair_str in pairs:
                 pair = pair_str.split(",")
-                add = False
-                for state in new_states:
-                    if pair[0] in state or pair[1] in state:
-                        state.append(pair[0])
-                        state.append(pair[1])
-                        add = True
-                if not add:
-                    new_states.append(pair)
+                parent[find(pair[0])] = find(pair[1])
+
+            new_states = {}
+            for state in list(parent.keys()):
+                new_states.setdefault(find(state), []).append(state)
+
+            return sorted(map(lambda x: ",".join(sorted(x)), new_states.values()))
+
+        def hopcroft_automata():
+
+            table = transitions.get_states_table()
+            following = {}
+            order = list(states)
+            if initial not in order:
+                order.insert(0, initial)
+            known = set(order)
+            for state_from, token, state_to in transitions.iterate_numbers():
+                following.setdefault((state_from, token), state_to)
+                if state_to not in known:
+                    known.add(state_to)
+                    order.append(state_to)
+            numbers = dict((state, i) for i, state in enumerate(order))
+            tokens_used = [token for token in alphabet if tokens.name(token) != ""]
+
+            delta = []
+            for state in order:
+                for token in tokens_used:
+                    if (state, token) not in following:
+                        raise ValueError("Automata must to be deterministic")
+                    delta.append(numbers[following[(state, token)]])
+
+            hopcroft = Hopcroft(len(order), len(tokens_used), delta,
+                                set(numbers[state] for state in aceptation))
+            with Instrumentation.phase("refinement"):
+                blocks = hopcroft.blocks()
+                if Instrumentation.ACTIVE:
+                    Instrumentation.count("passes", hopcroft.get_passes())
+                    Instrumentation.count("splits", hopcroft.get_splits())
+                    Instrumentation.count("blocks", len(blocks))
+            block = [0] * len(order)
+            for i, members in enumerate(blocks):
+                for member in members:
+                    block[member] = i
+
+            def names():
+                return Automata.unique_names([",".join(sorted(table.name(order[member])
+                                                              for member in members))
+                                              for members in blocks])
+
+            new_table = SymbolTable()
+            new_table.defer(len(blocks), names)
+            new_tokens = SymbolTable(map(tokens.name, tokens_used))
+            new_list = TransitionList(states=new_table, tokens=new_tokens)
+            for i, members in enumerate(blocks):
+                for j in range(len(tokens_used)):
+                    new_list.append_numbers(i, j, block[delta[members[0] * len(tokens_used) + j]])
+
+            new_aceptation = []
+            for state in aceptation:
+                if block[numbers[state]] not in new_aceptation:
+                    new_aceptation.append(block[numbers[state]])
 
-            new_states = sorted(list(map(lambda x: ",".join(list(set(x))), new_states)))
-
-            return new_states
+            new_automata = Automata()
+            new_automata.from_numbers(new_list,
+                                      range(len(blocks)),
+                                      range(len(tokens_used)),
+                                      block[numbers[initial]],
+                                      new_aceptation)
+            return new_automata
 
         def create_automata(new_states):
 
             # Build new automata
-            initial = list(filter(lambda x: self.get_initial() in x.split(","), new_states))[0]
+            new_name = {}
+            for new_state in new_states:
+                for state in new_state.split(","):
+                    new_name[state] = new_state
 
             new_automata = Automata()
-            new_automata.set_initial(initial)
+            new_automata.set_initial(new_name[self.get_initial()])
 
             # Mark acepation states
             for aceptation in self.get_aceptation():
-                acept = list(filter(lambda x: aceptation in x.split(","), new_states))[0]
+                acept = new_name[aceptation]
                 if acept not in new_automata.get_aceptation():
                     new_automata.get_aceptation().append(acept)
 
             # Create the transitions
             for new_state in new_states:
-                for token in self.get_alphabet():
+                for token in filter(lambda x: x != "", self.get_alphabet()):
                     zero_state = new_state.split(",")[0]
                     zero_to = self.fetch_transition(zero_state, token)[0].get_state_to()
-                    zero_to = list(filter(lambda x: zero_to in x.split(","), new_states))[0]
+                    zero_to = new_name[zero_to]
 
                     # add new transition
                     if not new_automata.fetch_transition(new_state, token, zero_to):
@@ -485,55 +880,180 @@ class Automata:
             new_automata.clean()
             return new_automata
 
-        pairs = build_pairs()
-        pairs = iterate_incompatibles(pairs)
-        new_states = create_new_state_pairs(pairs)
-        return create_automata(new_states)
+        if method == "hopcroft":
+            return hopcroft_automata()
 
-    def evaluate(self, one_string, one_callback=None):
+        pairs = build_pairs()
+        with Instrumentation.phase("refinement"):
+            pairs, passes = iterate_incompatibles(pairs)
+            if Instrumentation.ACTIVE:
+                Instrumentation.count("passes", passes)
+        return create_automata(create_new_state_pairs(pairs))
+
+    def evaluate(self, one_string, one_callback=None, engine="set", max_states=4096,
+                 max_bytes=None):
         """
         Test the automata with one_string, return if the one_string is valid
         Receive one callback to visualizate the evaluation
-        The callback receive (old_state, token, new_states)
+        The callback receive (old_states, token, new_states)
+        max_states and max_bytes are the limits of the cache of the lazy engine
+        """
+        return self.cursor(one_callback, engine, max_states, max_bytes) \
+                   .feed(one_string).accepting()
+
+    def simulation(self, engine="auto", max_states=4096, max_bytes=None):
+        """
+        Return one engine to evaluate the automata
+        set: simulation with sets of states, works for any automata
+        bitset: simulation with int bitmasks and precomputed successors, for big automatas
+        lazy: deterministic automata built while reading over the bitset simulation,
+              with one cache of max_states rows or max_bytes bytes
+        dfa: compiled Matcher, the automata is transformed to deterministic if is needed
+        auto: dfa when the automata is already deterministic, set otherwise
+        The lazy and dfa engines are kept and returned again until the automata changes
+        """
+
+        if engine == "auto":
+            matcher = self.__compiled(False)
+            return SetSimulation(self) if matcher is None else matcher
+
+        if engine == "set":
+            return SetSimulation(self)
+
+        if engine == "bitset":
+            return BitSimulation(self)
+
+        if engine == "lazy":
+            return self.lazy_engine(max_states, max_bytes)
+
+        if engine == "dfa":
+            return self.compile()
+
+        raise ValueError("engine parameter must to be [auto, set, bitset, lazy, dfa]")
+
+    def cursor(self, one_callback=None, engine="auto", max_states=4096, max_bytes=None):
+        """
+        Return one Cursor to evaluate the automata reading the input by chunks
+        The callback receive (old_states, token, new_states) on every step
+        """
+        return Cursor(self.simulation(engine, max_states, max_bytes), one_callback)
+
+    def lazy_engine(self, max_states=4096, max_bytes=None):
+        """
+        Return the LazyDFA of the automata, the same LazyDFA (with its cache
+        and counters) is returned until the automata or the limits change
+        """
+
+        transitions = self.__transitions
+        signature = self.__signature()
+        cached = self.__lazy
+        if cached is not None and cached[0] is transitions and \
+           cached[1:4] == (signature, max_states, max_bytes):
+            return cached[4]
+
+        engine = LazyDFA(self, max_states, max_bytes)
+        self.__lazy = (transitions, signature, max_states, max_bytes, engine)
+        return engine
+
+    def __signature(self):
+        """
+        Return what the compiled engines read of the automata besides the
+        transitions list, they are built again when it changes
         """
+        transitions, states, alphabet, initial, aceptation = self.to_numbers()
+        return (transitions.get_version(), len(transitions.get_states_table()),
+                initial, tuple(aceptation), tuple(states), tuple(alphabet))
 
-        # create one initial state with the begin of the automata
-        actual = [self.__initial]
+    def __compiled(self, determinize):
+        """
+        Return the cached Matcher of the automata, without determinize
+        return None when the automata is not already deterministic
+        The cache is kept until the transitions, states, alphabet, initial
+        or aceptation change
+        """
 
-        # read the string
-        for token in one_string:
+        transitions = self.__transitions
+        signature = self.__signature()
+        cached = self.__matcher
+        if cached is None or cached[0] is not transitions or cached[1] != signature:
+            try:
+                cached = (transitions, signature, Matcher.from_automata(self), True)
+            except ValueError:
+                cached = (transitions, signature, None, False)
+            self.__matcher = cached
+
+        if cached[2] is None and determinize:
+            cached = (transitions, signature, Matcher.from_automata(self.to_deterministic()), False)
+            self.__matcher = cached
+
+        if cached[3] or determinize:
+            return cached[2]
+        return None
 
-            # create follow iteration actual nodes by the evaluation
-            new_actual = []
+    def compile(self):
+        """
+        Return one immutable Matcher of the automata to evaluate many strings
+        The automata is transformed to deterministic when is needed, the
+        Matcher is kept and returned again until the automata changes
+        """
+        return self.__compiled(True)
 
-            # Add the epsilon transitions as well
-            for statex in actual:
-                fetch = self.fetch_transition(statex, "")
-                for fec in fetch:
-                    if fec.get_state_to() not in actual:
-                        actual.append(fec.get_state_to())
-            actual = sorted(list(set(actual)))
+    def evaluate_many(self, strings):
+        """
+        Test the automata with many strings at once
+        Return one NumPy bool array with the result of every string
+        Every batch uses the Matcher kept by compile() and its NumPy arrays,
+        so many small batches do not determinize the automata again
+        """
+        return self.compile().match_many(strings)
 
-            # get the transitions of the current nodes and match with the actual token
-            for current_state in actual:
-                for trans in self.fetch_transition(current_state, token):
-                    new_actual.append(trans.get_state_to())
-            new_actual = sorted(list(set(new_actual)))
+    def searcher(self, max_states=4096):
+        """ Return one Searcher to find the matches of the automata inside texts """
+        return Searcher(self, max_states)
 
-            # callback to debug evaluation
-            if one_callback is not None:
-                one_callback(actual, token, new_actual)
+    def finditer(self, text):
+        """ Iterate the leftmost-longest (start, end) spans of the matches inside text """
+        return self.searcher().finditer(text)
 
-            # update of new step
-            actual = new_actual
+    def reverse(self):
+        """
+        Return one automata that accepts the reversed strings of the language
+        Every transition is reversed and one new initial state goes with
+        epsilon to the old aceptation states, the old initial is the aceptation
+        """
 
-        # check if the latest step correspond to one aceptation state
-        for current_state in actual:
-            if current_state in self.__aceptation:
-                return True
+        transitions, states, alphabet, initial, aceptation = self.to_numbers()
+        table = transitions.get_states_table()
+        tokens = transitions.get_tokens_table()
+        count = len(table)
+
+        def names():
+            new_names = [table.name(number) for number in range(count)]
+            new_initial = "i"
+            while table.find(new_initial) is not None:
+                new_initial = "{0}_".format(new_initial)
+            return new_names + [new_initial]
+
+        new_table = SymbolTable()
+        new_table.defer(count + 1, names)
+        new_tokens = SymbolTable([tokens.name(number) for number in range(len(tokens))])
+        epsilon = new_tokens.number("")
+
+        new_list = TransitionList(states=new_table, tokens=new_tokens)
+        for state_from, token, state_to in transitions.iterate_numbers():
+            new_list.append_numbers(state_to, token, state_from)
+        for state in sorted(set(aceptation)):
+            new_list.append_numbers(count, epsilon, state)
+
+        alphabet = list(alphabet)
+        if aceptation and epsilon not in alphabet:
+            alphabet.append(epsilon)
 
-        return False
+        new_automata = Automata()
+        new_automata.from_numbers(new_list, list(states) + [count], alphabet, count, [initial])
+        return new_automata
 
+    @Instrumentation.operation
     def kleen_star(self):
         """ Return one autoamta with the Kleen star of original """
 
@@ -557,6 +1077,7 @@ class Automata:
         self_copy.clean()
         return self_copy
 
+    @Instrumentation.operation
     def generate_expresion(self):
         """ Generate the regular expresion of the automata """
 
@@ -581,6 +1102,8 @@ class Automata:
         wait_states.remove("f")
 
         #Start elimination of states
+        eliminations = len(wait_states)
+        new_count = 0
         while wait_states:
             to_delete_state = wait_states.pop()
 
@@ -606,12 +1129,17 @@ class Automata:
                     new_token = left.get_token() + in_token + right.get_token()
                     new_trans = Transition(left.get_state_from(), new_token, right.get_state_to())
                     copy_self.get_transitions().append(new_trans)
+            new_count += len(left_trans) * len(right_trans)
 
             # Remove unnecesary transitions
             for trans in full_trans:
                 copy_self.get_transitions().remove(trans)
             copy_self.get_states().remove(to_delete_state)
 
+        if Instrumentation.ACTIVE:
+            Instrumentation.count("state_eliminations", eliminations)
+            Instrumentation.count("new_transitions", new_count)
+
         final_trans = copy_self.fetch_transition("i", None, "f")
         final_trans = list(map(lambda x: "({0})".format(x.get_token()), final_trans))
         return "+".join(final_trans)
@@ -629,93 +1157,35 @@ class Automata:
         return automata
 
     @staticmethod
+    @Instrumentation.operation
     def read_expresion(exp):
-        """ Create an automata from a regular expresion """
-
-        def add_concatenation(exp_list):
-            new_exp = []
-            for i in range(0, len(exp_list)-1):
-                exp = exp_list[i]
-                next_exp = exp_list[i+1]
-
-                add = (isinstance(exp, Automata) and isinstance(next_exp, Automata))
-                add = add or (isinstance(exp, Automata) and next_exp == "(")
-                add = add or (exp == ")" and isinstance(next_exp, Automata))
-                add = add or (exp == ")" and next_exp == "(")
-                add = add or (exp == "*" and isinstance(next_exp, Automata))
-                add = add or (exp == ")" and next_exp == "(")
-
-                new_exp.append(exp)
-                if add:
-                    new_exp.append(".")
-
-            if exp_list:
-                new_exp.append(exp_list[-1])
-            return new_exp
-
-        def reverse_polish_map(exp_list, priority):
-            stack = []
-            sufix = []
-            for exp in exp_list:
-                if isinstance(exp, Automata):
-                    sufix.append(exp)
-                else:
-                    if exp == "(":
-                        stack.append(exp)
-                    elif exp == ")":
-                        last_exp = stack.pop()
-                        while last_exp != "(":
-                            sufix.append(last_exp)
-                            last_exp = stack.pop()
-                    else:
-                        while len(stack) >= 1 and (priority[stack[-1]] >= priority[exp]):
-                            sufix.append(stack.pop())
-                        stack.append(exp)
-
-            while len(stack) >= 1:
-                sufix.append(stack.pop())
-            return sufix
-
-        def reverse_polish_eval(exp_list):
-            stack = []
-            for exp in exp_list:
-                if isinstance(exp, Automata):
-                    stack.append(exp)
-                else:
-                    if exp == "*":
-                        auto = stack.pop()
-                        auto = auto.kleen_star()
-                        stack.append(auto)
-                    else:
-                        auto1 = stack.pop()
-                        auto2 = stack.pop()
-                        auto3 = None
-                        if exp == ".":
-                            auto3 = Automata.concatenation(auto2, auto1)
-                        else:
-                            auto3 = Automata.merge_automata(auto2, auto1, "union")
-                        stack.append(auto3)
-            return stack.pop()
-
-        priority = {
-            "*": 4,
-            ".": 3,
-            "+": 2,
-            "(": 1
-        }
-
-        exp_list = list(map(Automata.atomic_automata, exp))
-        exp_list = add_concatenation(exp_list)
-        rev_polish = reverse_polish_map(exp_list, priority)
-
-        auto = Automata.atomic_automata("")
-        if rev_polish:
-            auto = reverse_polish_eval(rev_polish)
-            auto.uniform_names()
+        """
+        Create an automata from a regular expresion
+        The automata is built in one pass with the Thompson construction
+        """
+
+        builder = Thompson()
+        initial, aceptation = builder.compile(exp)
+        numbers = builder.numbering(initial)
+
+        def names():
+            return list(map(lambda x: "q{0}".format(numbers[x]), range(builder.get_size())))
+
+        table = SymbolTable()
+        table.defer(builder.get_size(), names)
+        tokens = SymbolTable(sorted(set(map(lambda x: x[1], builder.get_transitions()))))
 
+        transitions = TransitionList(states=table, tokens=tokens)
+        for state_from, token, state_to in builder.get_transitions():
+            transitions.append_numbers(state_from, tokens.number(token), state_to)
+
+        auto = Automata()
+        auto.from_numbers(transitions, range(builder.get_size()), range(len(tokens)),
+                          initial, [aceptation])
         return auto
 
     @staticmethod
+    @Instrumentation.operation
     def concatenation(automata1, automata2):
         """ Return one automata that is the concatenation of two automatas """
 
@@ -745,80 +1215,70 @@ class Automata:
         return new_automata
 
     @staticmethod
-    def merge_automata(automata1, automata2, merge_type):
+    def find_counterexample(automata1, automata2):
+        """
+        Return None when both automatas accept the same language,
+        otherwise the shortest string accepted by only one of them
+        """
+        return Equivalence(automata1, automata2).counterexample()
+
+    @staticmethod
+    @Instrumentation.operation
+    def merge_automata(automata1, automata2, merge_type, prune=False):
         """
         Return one automata that is the merge of two automatas
-        The merge type must to be union or intersection
+        The merge type must to be union, intersection or equiv
+        equiv raise ValueError with the shortest counterexample when the
+        automatas are not equivalent, otherwise returns one copy of automata1
+        With prune the states that can not reach one aceptation are joined
+        into one only "empty" state
         """
 
         if merge_type not in ["union", "intersection", "equiv"]:
             raise ValueError("merge_type parameter must to be [union, intersection, equiv]")
 
-        deter1 = automata1.to_deterministic()
-        deter2 = automata2.to_deterministic()
-
-        new_automata = Automata()
-        new_automata.set_alphabet(list(set(automata1.get_alphabet()+automata2.get_alphabet())))
-        new_automata.set_initial(",".join([automata1.get_initial(), automata2.get_initial()]))
-        new_automata.set_states([new_automata.get_initial()])
-        new_automata.set_transitions([])
-
-        equivalence = {}
         if merge_type == "equiv":
-            deter1 = deter1.minimizete()
-            deter2 = deter2.minimizete()
-            deter1.uniform_names()
-            deter2.uniform_names()
-
-        # Evaluate every path of the automata
-        while not new_automata.is_deterministic():
-
-            incomplete = new_automata.get_next_incomplete()
-            incomplete_split = incomplete.split(",")
-
-            for token in new_automata.get_alphabet():
-
-                goes_one = deter1.fetch_transition(incomplete_split[0], token)
-                goes_two = deter2.fetch_transition(incomplete_split[1], token)
-
-                goes_one = list(map(lambda x: x.get_state_to(), goes_one))
-                goes_two = list(map(lambda x: x.get_state_to(), goes_two))
-
-                goes_list = goes_one + goes_two
-                goes = ",".join(goes_list)
-                if len(goes_list) == 1:
-                    goes = "{0},{0}".format(goes_list[0])
-
-                if merge_type == "equiv":
-                    equiv_pair = goes.split(",")
-                    if equiv_pair[0] not in equivalence:
-                        equivalence[equiv_pair[0]] = equiv_pair[1]
-                    else:
-                        if equivalence[equiv_pair[0]] != equiv_pair[1]:
-                            error_str = "State [a1:{0}] with '{1}' ".format(equiv_pair[0], token)
-                            error_str += "goes to [a2:{0}] ".format(equiv_pair[1])
-                            error_str += "instead of [a2:{0}]".format(equivalence[equiv_pair[0]])
-                            raise ValueError(error_str)
-
-                if goes not in new_automata.get_states():
-                    new_automata.get_states().append(goes)
-
-                if not new_automata.fetch_transition(incomplete, token, goes):
-                    trans = Transition(incomplete, token, goes)
-                    new_automata.get_transitions().append(trans)
+            counterexample = Automata.find_counterexample(automata1, automata2)
+            if counterexample is not None:
+                error_str = "String '{0}' is accepted by only one automata".format(counterexample)
+                raise ValueError(error_str)
+            return automata1.copy()
+
+        alive = None
+        if prune:
+            alive = any if merge_type == "union" else all
+
+        product = Product([automata1.compile(), automata2.compile()], alive)
+        states, transitions = product.build()
+
+        def names():
+            new_names = map(lambda x: "empty" if x is None else product.state_name(x), states)
+            return Automata.unique_names(list(new_names))
+
+        table = SymbolTable()
+        table.defer(len(states), names)
+        tokens = SymbolTable(product.get_alphabet())
+        new_list = TransitionList(states=table, tokens=tokens)
+        for state_from, token, state_to in transitions:
+            new_list.append_numbers(state_from, tokens.number(token), state_to)
 
         # Calculate aceptation states
-        for state in new_automata.get_states():
+        aceptation = []
+        for i, state in enumerate(states):
+            if state is None:
+                continue
 
-            if merge_type == "union":
-                if state.split(",")[0] in deter1.get_aceptation() or \
-                   state.split(",")[1] in deter2.get_aceptation():
-                    new_automata.get_aceptation().append(state)
+            tags = product.tags(state)
+            if merge_type == "union" and tags:
+                aceptation.append(i)
 
-            elif merge_type == "intersection":
-                if state.split(",")[0] in deter1.get_aceptation() and \
-                   state.split(",")[1] in deter2.get_aceptation():
-                    new_automata.get_aceptation().append(state)
+            elif merge_type == "intersection" and len(tags) == 2:
+                aceptation.append(i)
 
-        new_automata.clean()
+        new_automata = Automata()
+        new_automata.from_numbers(new_list,
+                                  sorted(set(x[0] for x in transitions)),
+                                  range(len(tokens)),
+                                  0,
+                                  aceptation)
         return new_automata
@@ -0,0 +1,214 @@
+#!/usr/bin/python
+"""
+BatchEvaluator class
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+class BatchEvaluator:
+    """
+    Evaluate big inputs with one automata over a pool of processes
+    The automata is compiled once to one Matcher and every worker receives
+    it once when starts, the tasks only carry the chunks of strings.
+    The files are split by byte ranges ended on one new line and every
+    worker reads its own ranges, so only the results go between processes
+    The results are returned in the order of the input, the number of
+    chunks in flight is bounded so the memory does not depend on the input
+    """
+
+    WORKER = {}
+
+    def __init__(self, automata, workers=None, chunk_size=65536, chunk_bytes=1 << 20):
+        """
+        Constructor, workers is the number of processes (default the cores),
+        chunk_size the strings by task and chunk_bytes the bytes of one
+        file by task
+        """
+        self.__matcher = automata.compile()
+        self.__workers = workers or os.cpu_count() or 1
+        self.__chunk_size = max(1, chunk_size)
+        self.__chunk_bytes = max(1, chunk_bytes)
+        self.__executor = None
+        self.__stats = {}
+        self.__elapsed = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def get_workers(self):
+        """ Getter """
+        return self.__workers
+
+    def get_elapsed(self):
+        """ Getter, seconds of the batches evaluated since the last reset """
+        return self.__elapsed
+
+    def get_stats(self):
+        """
+        Return one dict by worker (process id) with the chunks, strings and
+        chars evaluated, the seconds busy and the strings by second
+        """
+        stats = {}
+        for pid, (chunks, strings, chars, seconds) in self.__stats.items():
+            stats[pid] = {
+                "chunks": chunks,
+                "strings": strings,
+                "chars": chars,
+                "seconds": seconds,
+                "strings_per_second": strings / seconds if seconds else 0.0
+            }
+        return stats
+
+    def reset_stats(self):
+        """ Forget the stats of the batches already evaluated """
+        self.__stats = {}
+        self.__elapsed = 0.0
+
+    def close(self):
+        """ Stop the worker processes """
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+
+    def __pool(self):
+        """ Return the pool, the processes are started the first time """
+        if self.__executor is None:
+            self.__executor = ProcessPoolExecutor(self.__workers,
+                                                  initializer=BatchEvaluator.initialize,
+                                                  initargs=(self.__matcher,))
+        return self.__executor
+
+    @staticmethod
+    def initialize(matcher):
+        """ Keep the matcher in the worker process """
+        BatchEvaluator.WORKER["matcher"] = matcher
+
+    @staticmethod
+    def match_chunk(strings):
+        """ Evaluate one chunk in one worker, return (pid, chars, seconds, results) """
+
+        start = time.perf_counter()
+        results = BatchEvaluator.WORKER["matcher"].match_many(strings)
+        if isinstance(results, list):
+            results = bytes(bytearray(results))
+        else:
+            results = results.tobytes()
+        chars = sum(map(len, strings))
+        return os.getpid(), chars, time.perf_counter() - start, results
+
+    @staticmethod
+    def match_range(filename, start, end):
+        """ Evaluate the lines of one byte range of one file in one worker """
+
+        with open(filename, "rb") as filex:
+            filex.seek(start)
+            data = filex.read(end - start)
+
+        return BatchEvaluator.match_chunk(BatchEvaluator.split_lines(data))
+
+    @staticmethod
+    def split_lines(data):
+        """
+        Return the lines of bytes read from one file, only "\n" ends one line
+        and one "\r" before it is removed
+        """
+
+        lines = data.decode("utf-8").split("\n")
+        if lines[-1] == "":
+            lines.pop()
+        return [line[:-1] if line.endswith("\r") else line for line in lines]
+
+    @staticmethod
+    def read_lines(filename):
+        """ Iterate the lines of one file, split like the lines of the workers """
+        with open(filename, "rb") as filex:
+            for data in filex:
+                for line in BatchEvaluator.split_lines(data):
+                    yield line
+
+    def __collect(self, futures):
+        """ Run the tasks given by futures and yield the results in order """
+
+        begin = time.perf_counter()
+        window = 4 * self.__workers
+        pending = deque()
+
+        def finish():
+            pid, chars, seconds, results = pending.popleft().result()
+            chunks, strings, old_chars, busy = self.__stats.get(pid, (0, 0, 0, 0.0))
+            self.__stats[pid] = (chunks + 1, strings + len(results), old_chars + chars,
+                                 busy + seconds)
+            return results
+
+        try:
+            for future in futures:
+                pending.append(future)
+                if len(pending) >= window:
+                    for result in finish():
+                        yield result == 1
+            while pending:
+                for result in finish():
+                    yield result == 1
+        finally:
+            for future in pending:
+                future.cancel()
+            self.__elapsed += time.perf_counter() - begin
+
+    def iterate(self, strings):
+        """ Iterate the result of every string of one iterable, in order """
+
+        pool = self.__pool()
+
+        def futures():
+            chunk = []
+            for one_string in strings:
+                chunk.append(one_string)
+                if len(chunk) == self.__chunk_size:
+                    yield pool.submit(BatchEvaluator.match_chunk, chunk)
+                    chunk = []
+            if chunk:
+                yield pool.submit(BatchEvaluator.match_chunk, chunk)
+
+        return self.__collect(futures())
+
+    def ranges(self, filename):
+        """ Return the list of (start, end) byte ranges of one file, ended on new line """
+
+        size = os.path.getsize(filename)
+        ranges = []
+        with open(filename, "rb") as filex:
+            start = 0
+            while start < size:
+                filex.seek(min(size, start + self.__chunk_bytes))
+                filex.readline()
+                end = min(size, filex.tell())
+                ranges.append((start, end))
+                start = end
+        return ranges
+
+    def iterate_files(self, filenames):
+        """ Iterate the result of every line of the files, in order """
+
+        pool = self.__pool()
+
+        def futures():
+            for filename in filenames:
+                for start, end in self.ranges(filename):
+                    yield pool.submit(BatchEvaluator.match_range, filename, start, end)
+
+        return self.__collect(futures())
+
+    def evaluate(self, strings):
+        """ Return the list of results of every string """
+        return list(self.iterate(strings))
+
+    def evaluate_files(self, filenames):
+        """ Return the list of results of every line of the files """
+        return list(self.iterate_files(filenames))
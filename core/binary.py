@@ -0,0 +1,287 @@
+#!/usr/bin/python
+"""
+BinaryAutomata class
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+
+from core.matcher import Matcher
+
+class BinaryAutomata:
+    """
+    Compact binary file of one automata loaded with mmap without copies
+    Every name (states and tokens) is saved once in one string table and
+    the alphabet, states, transitions and aceptation are arrays of uint32
+    indexes on that table. Optionally the file keeps the table of the
+    Matcher of the automata, so one Matcher is created over the mapped
+    pages and many processes share the same copy of the page cache
+
+    Layout, little endian and every section aligned to 8 bytes:
+    header, string offsets, string bytes (utf-8), alphabet, states,
+    transitions (state_from, token, state_to), aceptation and the optional
+    matcher section: header, states, alphabet, aceptation bytes, int64 table
+    """
+
+    MAGIC = b"AUTB"
+    VERSION = 1
+    HEADER = struct.Struct("<4sIIIIIIIII")
+    TABLE_HEADER = struct.Struct("<IIq")
+    FLAG_TABLE = 1
+
+    def __init__(self, filename):
+        """ Constructor, map the file and the views of every section """
+
+        # The map keeps its own handle of the file
+        with open(filename, "rb") as filex:
+            try:
+                self.__map = mmap.mmap(filex.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError("'{0}' is not one binary automata".format(filename))
+        self.__views = []
+        self.__strings = {}
+
+        try:
+            self.__read_sections()
+        except (ValueError, TypeError, struct.error):
+            self.close()
+            raise ValueError("'{0}' is not one binary automata".format(filename))
+
+    def __view(self, offset, count, code):
+        """ Return one view of count items of type code and the next aligned offset """
+
+        size = count * struct.calcsize(code)
+        if offset + size > len(self.__map):
+            raise ValueError("Truncated binary automata")
+
+        view = memoryview(self.__map)[offset:offset + size]
+        if code != "B":
+            view = view.cast(code)
+            if sys.byteorder != "little":
+                view = array(code, view)
+                view.byteswap()
+        self.__views.append(view)
+        return view, BinaryAutomata.align(offset + size)
+
+    def __read_sections(self):
+        """ Read the header and create the view of every section """
+
+        header = BinaryAutomata.HEADER.unpack_from(self.__map, 0)
+        magic, version, flags, n_strings, n_bytes = header[:5]
+        n_alphabet, n_states, n_transitions, n_aceptation, initial = header[5:]
+        if magic != BinaryAutomata.MAGIC or version != BinaryAutomata.VERSION:
+            raise ValueError("Invalid header")
+
+        offset = BinaryAutomata.align(BinaryAutomata.HEADER.size)
+        self.__offsets, offset = self.__view(offset, n_strings + 1, "I")
+        self.__bytes, offset = self.__view(offset, n_bytes, "B")
+        self.__alphabet, offset = self.__view(offset, n_alphabet, "I")
+        self.__states, offset = self.__view(offset, n_states, "I")
+        self.__transitions, offset = self.__view(offset, 3 * n_transitions, "I")
+        self.__aceptation, offset = self.__view(offset, n_aceptation, "I")
+        self.__initial = initial
+
+        self.__table = None
+        if flags & BinaryAutomata.FLAG_TABLE:
+            size, width, start = BinaryAutomata.TABLE_HEADER.unpack_from(self.__map, offset)
+            offset = BinaryAutomata.align(offset + BinaryAutomata.TABLE_HEADER.size)
+            states, offset = self.__view(offset, size, "I")
+            alphabet, offset = self.__view(offset, width - 1, "I")
+            aceptation, offset = self.__view(offset, size + 1, "B")
+            table, offset = self.__view(offset, (size + 1) * width, "q")
+            self.__table = (states, alphabet, aceptation, table, start)
+
+    @staticmethod
+    def align(offset):
+        """ Return the next offset multiple of 8 """
+        return (offset + 7) & ~7
+
+    @staticmethod
+    def is_binary(filename):
+        """ Return if the file starts with the magic of the binary format """
+        with open(filename, "rb") as filex:
+            return filex.read(len(BinaryAutomata.MAGIC)) == BinaryAutomata.MAGIC
+
+    def close(self):
+        """
+        Release the views and the map of the file, the views given by the
+        getters of numbers must not be used after close
+        """
+        for view in reversed(self.__views):
+            if isinstance(view, memoryview):
+                view.release()
+        self.__views = []
+        self.__table = None
+        self.__map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def string(self, index):
+        """ Return the string index of the string table """
+
+        value = self.__strings.get(index)
+        if value is None:
+            begin = self.__offsets[index]
+            end = self.__offsets[index + 1]
+            value = self.__bytes[begin:end].tobytes().decode("utf-8", "surrogatepass")
+            self.__strings[index] = value
+        return value
+
+    def get_string_count(self):
+        """ Getter, number of strings of the string table """
+        return len(self.__offsets) - 1
+
+    def get_strings(self):
+        """ Return the list of all the strings, the index of every string is its number """
+        return [self.string(index) for index in range(self.get_string_count())]
+
+    def get_alphabet(self):
+        """ Getter """
+        return [self.string(index) for index in self.__alphabet]
+
+    def get_states(self):
+        """ Getter """
+        return [self.string(index) for index in self.__states]
+
+    def get_initial(self):
+        """ Getter """
+        return self.string(self.__initial)
+
+    def get_aceptation(self):
+        """ Getter """
+        return [self.string(index) for index in self.__aceptation]
+
+    def get_alphabet_numbers(self):
+        """ Getter, read-only view of the string numbers of the alphabet """
+        return self.__alphabet
+
+    def get_state_numbers(self):
+        """ Getter, read-only view of the string numbers of the states """
+        return self.__states
+
+    def get_initial_number(self):
+        """ Getter, string number of the initial state """
+        return self.__initial
+
+    def get_aceptation_numbers(self):
+        """ Getter, read-only view of the string numbers of the aceptation states """
+        return self.__aceptation
+
+    def get_transition_numbers(self):
+        """
+        Getter, read-only view of the transitions as string numbers, three
+        by transition (state_from, token, state_to)
+        """
+        return self.__transitions
+
+    def get_size(self):
+        """ Getter, number of transitions """
+        return len(self.__transitions) // 3
+
+    def iterate_transitions(self):
+        """ Iterate the transitions as (state_from, token, state_to) """
+        string = self.string
+        transitions = self.__transitions
+        for i in range(0, len(transitions), 3):
+            yield (string(transitions[i]), string(transitions[i + 1]),
+                   string(transitions[i + 2]))
+
+    def has_table(self):
+        """ Return if the file keeps the table of one Matcher """
+        return self.__table is not None
+
+    def matcher(self):
+        """
+        Return one Matcher over the table of the file without copy it,
+        the file must be saved with table=True and keep open while
+        the matcher is used
+        """
+
+        if self.__table is None:
+            raise ValueError("Binary automata without matcher table")
+
+        states, alphabet, aceptation, table, start = self.__table
+        width = len(alphabet) + 1
+        return Matcher([self.string(index) for index in states],
+                       [self.string(index) for index in alphabet],
+                       table,
+                       start // width,
+                       [state for state in range(len(states)) if aceptation[state]])
+
+    @staticmethod
+    def write(automata, filename, table=False):
+        """
+        Save the automata in the binary format, with table=True also save the
+        table of the Matcher of the automata (must be deterministic)
+        """
+
+        numbers = {}
+        strings = []
+
+        def intern(one_string):
+            if not isinstance(one_string, str):
+                raise ValueError("Only string names can be saved: {0!r}".format(one_string))
+            number = numbers.get(one_string)
+            if number is None:
+                number = len(strings)
+                numbers[one_string] = number
+                strings.append(one_string)
+            return number
+
+        alphabet = array("I", map(intern, automata.get_alphabet()))
+        states = array("I", map(intern, automata.get_states()))
+        transitions = array("I")
+        for trans in automata.get_transitions():
+            transitions.append(intern(trans.get_state_from()))
+            transitions.append(intern(trans.get_token()))
+            transitions.append(intern(trans.get_state_to()))
+        aceptation = array("I", map(intern, automata.get_aceptation()))
+        initial = intern(automata.get_initial())
+
+        matcher = None
+        if table:
+            matcher = Matcher.from_automata(automata)
+            table_states = array("I", map(intern, matcher.get_states()))
+            table_alphabet = array("I", map(intern, matcher.get_alphabet()))
+
+        encoded = [one_string.encode("utf-8", "surrogatepass") for one_string in strings]
+        offsets = array("I", [0])
+        for one_bytes in encoded:
+            offsets.append(offsets[-1] + len(one_bytes))
+
+        flags = BinaryAutomata.FLAG_TABLE if matcher is not None else 0
+        header = BinaryAutomata.HEADER.pack(
+            BinaryAutomata.MAGIC, BinaryAutomata.VERSION, flags, len(strings),
+            offsets[-1], len(alphabet), len(states), len(transitions) // 3,
+            len(aceptation), initial)
+
+        sections = [header, offsets, b"".join(encoded), alphabet, states, transitions, aceptation]
+        if matcher is not None:
+            size = len(matcher.get_states())
+            sections.append(BinaryAutomata.TABLE_HEADER.pack(
+                size, matcher.get_width(), matcher.get_initial()))
+            sections.append(table_states)
+            sections.append(table_alphabet)
+            sections.append(bytes(int(matcher.is_aceptation(state * matcher.get_width()))
+                                  for state in range(size + 1)))
+            sections.append(array("q", matcher.get_table()))
+
+        with open(filename, "wb") as filex:
+            offset = 0
+            for section in sections:
+                if isinstance(section, array):
+                    if sys.byteorder != "little":
+                        section = array(section.typecode, section)
+                        section.byteswap()
+                    section = section.tobytes()
+                filex.write(section)
+                offset += len(section)
+                padding = BinaryAutomata.align(offset) - offset
+                filex.write(b"\0" * padding)
+                offset += padding
@@ -0,0 +1,120 @@
+#!/usr/bin/python
+"""
+BitSimulation class
+"""
+
+from core.closure import EpsilonClosure
+
+class BitSimulation:
+    """
+    Simulation of one automata keeping the actual states as one int bitmask
+    Every state is numbered and the successors of every (state, token) are
+    precomputed as one mask already closed by the epsilon cerradure, so one
+    step is one OR for every active state
+    """
+
+    def __init__(self, automata):
+        """ Constructor """
+
+        transitions, states, _, initial, aceptation = automata.to_numbers()
+        names = transitions.get_states_table()
+        tokens = transitions.get_tokens_table()
+
+        states = list(states)
+        known = set(states)
+        for state in [initial] + aceptation:
+            if state not in known:
+                known.add(state)
+                states.append(state)
+        for state_from, _, state_to in transitions.iterate_numbers():
+            for state in [state_from, state_to]:
+                if state not in known:
+                    known.add(state)
+                    states.append(state)
+
+        numbers = dict((state, i) for i, state in enumerate(states))
+        self.__states = names.view(states)
+        self.__names = names
+        self.__numbers = numbers
+
+        # Epsilon cerradure mask of every state
+        epsilon_token = tokens.find("")
+        epsilon = [[] for _ in states]
+        for state_from, token, state_to in transitions.iterate_numbers():
+            if token == epsilon_token:
+                epsilon[numbers[state_from]].append(numbers[state_to])
+
+        closures = EpsilonClosure(len(states), epsilon).masks()
+        self.__closures = closures
+
+        # Closed successors of every (state, token)
+        successors = {}
+        for state_from, token, state_to in transitions.iterate_numbers():
+            if token == epsilon_token:
+                continue
+            table = successors.setdefault(tokens.name(token), {})
+            state_from = numbers[state_from]
+            table[state_from] = table.get(state_from, 0) | closures[numbers[state_to]]
+        self.__successors = successors
+
+        self.__initial = closures[numbers[initial]]
+        self.__aceptation = 0
+        for state in aceptation:
+            self.__aceptation |= 1 << numbers[state]
+
+    def get_states(self):
+        """ Getter """
+        return self.__states
+
+    def get_initial(self):
+        """ Return the initial mask """
+        return self.__initial
+
+    def closure(self, one_state):
+        """ Return the epsilon cerradure mask of one state name """
+        return self.__closures[self.__numbers[self.__names.find(one_state)]]
+
+    def step(self, mask, token):
+        """ Return the mask reached from mask reading one token """
+        table = self.__successors.get(token)
+        if table is None:
+            return 0
+        new_mask = 0
+        while mask:
+            low = mask & -mask
+            new_mask |= table.get(low.bit_length() - 1, 0)
+            mask ^= low
+        return new_mask
+
+    def run(self, mask, one_string):
+        """ Return the mask reached from mask reading one_string """
+        successors = self.__successors
+        for token in one_string:
+            table = successors.get(token)
+            if table is None or not mask:
+                return 0
+            new_mask = 0
+            while mask:
+                low = mask & -mask
+                new_mask |= table.get(low.bit_length() - 1, 0)
+                mask ^= low
+            mask = new_mask
+        return mask
+
+    def is_aceptation(self, mask):
+        """ Return if the mask contains one aceptation state """
+        return mask & self.__aceptation != 0
+
+    @staticmethod
+    def is_dead(mask):
+        """ Return if the mask can not reach any state """
+        return mask == 0
+
+    def state_names(self, mask):
+        """ Return the sorted list of names of the mask """
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self.__states[low.bit_length() - 1])
+            mask ^= low
+        return sorted(names)
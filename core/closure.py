@@ -0,0 +1,120 @@
+#!/usr/bin/python
+"""
+EpsilonClosure class
+"""
+
+class EpsilonClosure:
+    """
+    Epsilon cerradure of all the states of one graph at the same time
+    The states are numbered 0..size-1 and edges[state] is the list of states
+    reached with one epsilon transition
+    The strongly connected components are found with one iterative Tarjan,
+    it gives the components in reverse topological order so every closure is
+    the component plus the closures of the components already done
+    """
+
+    def __init__(self, size, edges):
+        """ Constructor """
+        self.__size = size
+        self.__edges = edges
+        self.__masks = None
+
+    def get_size(self):
+        """ Getter, number of states """
+        return self.__size
+
+    def masks(self):
+        """ Return the list of closures as int bitmasks, one by state """
+        if self.__masks is None:
+            self.__masks = self.__compute()
+        return self.__masks
+
+    def closure(self, state):
+        """ Return the list of states of the closure of one state """
+        return EpsilonClosure.members(self.masks()[state])
+
+    @staticmethod
+    def members(mask):
+        """ Return the list of states of one bitmask """
+        states = []
+        while mask:
+            low = mask & -mask
+            states.append(low.bit_length() - 1)
+            mask ^= low
+        return states
+
+    def __compute(self):
+        """ Tarjan components and topological pass """
+
+        size = self.__size
+        edges = self.__edges
+
+        index = [-1] * size
+        lowlink = [0] * size
+        on_stack = [False] * size
+        component = [-1] * size
+        stack = []
+        masks = []
+        counter = 0
+
+        for root in range(size):
+            if index[root] != -1:
+                continue
+
+            # Explicit DFS stack of (state, position in its edges)
+            work = [(root, 0)]
+            while work:
+                state, position = work.pop()
+                if position == 0:
+                    index[state] = counter
+                    lowlink[state] = counter
+                    counter += 1
+                    stack.append(state)
+                    on_stack[state] = True
+
+                recurse = False
+                following = edges[state]
+                while position < len(following):
+                    target = following[position]
+                    position += 1
+                    if index[target] == -1:
+                        work.append((state, position))
+                        work.append((target, 0))
+                        recurse = True
+                        break
+                    if on_stack[target]:
+                        lowlink[state] = min(lowlink[state], index[target])
+                if recurse:
+                    continue
+
+                # All the edges are done, close the component if is the root
+                if lowlink[state] == index[state]:
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component[member] = len(masks)
+                        members.append(member)
+                        if member == state:
+                            break
+
+                    mask = 0
+                    if len(members) > 64:
+                        bits = bytearray((size + 7) // 8)
+                        for member in members:
+                            bits[member >> 3] |= 1 << (member & 7)
+                        mask = int.from_bytes(bytes(bits), "little")
+                    else:
+                        for member in members:
+                            mask |= 1 << member
+                    for member in members:
+                        for target in edges[member]:
+                            if component[target] != len(masks):
+                                mask |= masks[component[target]]
+                    masks.append(mask)
+
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[state])
+
+        return [masks[component[state]] for state in range(size)]
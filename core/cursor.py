@@ -0,0 +1,93 @@
+#!/usr/bin/python
+"""
+Cursor class
+"""
+
+import codecs
+
+class Cursor:
+    """
+    Resumable evaluation of one automata over input given by chunks
+    The engine is one Matcher or one simulation of the automata, the cursor
+    only keeps the actual state of the engine so the memory is constant
+    The trace callback receive (old_states, token, new_states) on every step,
+    without trace the chunks are given directly to the engine
+    """
+
+    def __init__(self, engine, one_callback=None):
+        """ Constructor """
+        self.__engine = engine
+        self.__trace = one_callback
+        self.__state = engine.get_initial()
+        self.__position = 0
+
+    def get_engine(self):
+        """ Getter """
+        return self.__engine
+
+    def get_position(self):
+        """ Getter, number of tokens read """
+        return self.__position
+
+    def reset(self):
+        """ Go back to the initial state """
+        self.__state = self.__engine.get_initial()
+        self.__position = 0
+        return self
+
+    def feed(self, chunk):
+        """ Read one chunk of the input """
+
+        if self.__trace is None:
+            self.__state = self.__engine.run(self.__state, chunk)
+        else:
+            engine = self.__engine
+            state = self.__state
+            for token in chunk:
+                new_state = engine.step(state, token)
+                self.__trace(engine.state_names(state), token, engine.state_names(new_state))
+                state = new_state
+            self.__state = state
+
+        self.__position += len(chunk)
+        return self
+
+    def feed_from(self, source, chunk_size=65536, encoding="utf-8"):
+        """
+        Read all the input from one file object or one iterable of chunks
+        The file objects are read by chunk_size, bytes are decoded with encoding
+        """
+
+        chunks = source
+        if hasattr(source, "read"):
+            chunks = iter(lambda: source.read(chunk_size), source.read(0))
+
+        decoder = None
+        for chunk in chunks:
+            if isinstance(chunk, bytes):
+                if decoder is None:
+                    decoder = codecs.getincrementaldecoder(encoding)()
+                chunk = decoder.decode(chunk)
+            self.feed(chunk)
+
+        if decoder is not None:
+            self.feed(decoder.decode(b"", True))
+
+        return self
+
+    def accepting(self):
+        """ Return if the input read until now is valid """
+        return self.__engine.is_aceptation(self.__state)
+
+    def is_dead(self):
+        """ Return if no more input can make the input valid """
+        return self.__engine.is_dead(self.__state)
+
+    def snapshot(self):
+        """ Return the actual point of the evaluation to restore it later """
+        return (self.__state, self.__position)
+
+    def restore(self, one_snapshot):
+        """ Go back to one point given by snapshot """
+        self.__state, self.__position = one_snapshot
+        return self
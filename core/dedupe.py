@@ -0,0 +1,146 @@
+#!/usr/bin/python
+"""
+Deduplicator class
+"""
+
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from core.automata import Automata
+
+class Deduplicator:
+    """
+    Group many regular expresions by the language they accept
+    Every expresion is compiled to its minimal deterministic automata and
+    written in one canonical form: the states without dead states numbered
+    in BFS order from the initial state with the tokens sorted. Two minimal
+    automatas of the same language are equal up to the names of the states,
+    so two expresions have the same language when they have the same form.
+    The forms are grouped by one short hash and the expresions of the same
+    hash are compared by the complete form, so one collision can not join
+    two different languages
+    The forms are computed over one pool of processes
+    """
+
+    def __init__(self, workers=None, chunk_size=64):
+        """ Constructor, workers is the number of processes (default the cores) """
+        self.__workers = workers or os.cpu_count() or 1
+        self.__chunk_size = max(1, chunk_size)
+
+    def get_workers(self):
+        """ Getter """
+        return self.__workers
+
+    @staticmethod
+    def canonical(automata):
+        """
+        Return the canonical form of the language of one automata as bytes,
+        the automata is determinized and minimized when is needed
+        """
+
+        if not automata.is_deterministic():
+            automata = automata.to_deterministic()
+        matcher = automata.minimizete().compile()
+        alphabet = matcher.get_alphabet()
+        width = matcher.get_width()
+        table = matcher.get_table()
+        live = matcher.live()
+
+        # Only the tokens between two live states are part of the language
+        tokens = set()
+        for state in range(len(matcher.get_states())):
+            if live[state]:
+                for column in range(width - 1):
+                    if live[table[state * width + column] // width]:
+                        tokens.add(column)
+        tokens = sorted(tokens, key=lambda x: alphabet[x])
+
+        rows = []
+        initial = matcher.get_initial()
+        if live[initial // width]:
+            numbers = {initial: 0}
+            pending = deque([initial])
+            while pending:
+                state = pending.popleft()
+                row = [1 if matcher.is_aceptation(state) else 0]
+                for column in tokens:
+                    target = table[state + column]
+                    if not live[target // width]:
+                        row.append(-1)
+                        continue
+                    if target not in numbers:
+                        numbers[target] = len(numbers)
+                        pending.append(target)
+                    row.append(numbers[target])
+                rows.append(row)
+
+        form = [[alphabet[column] for column in tokens], rows]
+        return json.dumps(form, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def fingerprint(exp):
+        """ Return (hash, canonical form) of the language of one regular expresion """
+        if not exp:
+            raise ValueError("Invalid regular expresion: empty expresion")
+        form = Deduplicator.canonical(Automata.read_expresion(exp))
+        return hashlib.blake2b(form, digest_size=8).hexdigest(), form
+
+    @staticmethod
+    def fingerprint_many(expresions):
+        """ Return the fingerprint of every expresion, (None, error) for the invalid ones """
+
+        results = []
+        for exp in expresions:
+            try:
+                results.append(Deduplicator.fingerprint(exp))
+            except ValueError as error:
+                results.append((None, str(error)))
+        return results
+
+    def fingerprints(self, expresions):
+        """ Iterate the fingerprint of every expresion in order """
+
+        if self.__workers == 1:
+            for result in Deduplicator.fingerprint_many(expresions):
+                yield result
+            return
+
+        chunks = [expresions[i:i + self.__chunk_size]
+                  for i in range(0, len(expresions), self.__chunk_size)]
+        with ProcessPoolExecutor(self.__workers) as executor:
+            for results in executor.map(Deduplicator.fingerprint_many, chunks):
+                for result in results:
+                    yield result
+
+    def group(self, expresions):
+        """
+        Return (groups, errors), groups is the list of lists of indexes of
+        the expresions with the same language in order of first appearance,
+        errors is one dict of index -> message of the invalid expresions
+        """
+
+        expresions = list(expresions)
+        groups = []
+        errors = {}
+        buckets = {}
+
+        for index, (digest, form) in enumerate(self.fingerprints(expresions)):
+            if digest is None:
+                errors[index] = form
+                continue
+
+            # Only the same form is the same language, the hash can collide
+            bucket = buckets.setdefault(digest, [])
+            for one_form, members in bucket:
+                if one_form == form:
+                    members.append(index)
+                    break
+            else:
+                members = [index]
+                bucket.append((form, members))
+                groups.append(members)
+
+        return groups, errors
@@ -0,0 +1,100 @@
+#!/usr/bin/python
+"""
+Equivalence class
+"""
+
+from collections import deque
+
+from core.lazy import LazyDFA
+
+class Equivalence:
+    """
+    Equivalence of the languages of two automatas
+    Both automatas are determinized on the fly with one LazyDFA, so they can
+    be non deterministic with epsilon transitions
+    The check is Hopcroft-Karp: one union-find over the states of both
+    automatas that stops in the first pair with different aceptation
+    """
+
+    def __init__(self, automata1, automata2, max_states=65536):
+        """ Constructor """
+        self.__left = LazyDFA(automata1, max_states)
+        self.__right = LazyDFA(automata2, max_states)
+
+        alphabet = set()
+        for automata in [automata1, automata2]:
+            transitions = automata.to_numbers()[0]
+            tokens = transitions.get_tokens_table()
+            for _, token, _ in transitions.iterate_numbers():
+                alphabet.add(tokens.name(token))
+        alphabet.discard("")
+        self.__alphabet = sorted(alphabet)
+
+    def __differ(self, pair):
+        """ Return if the pair of states have different aceptation """
+        return self.__left.is_aceptation(pair[0]) != self.__right.is_aceptation(pair[1])
+
+    def __following(self, pair, token):
+        """ Return the pair reached from pair reading token """
+        return (self.__left.step(pair[0], token), self.__right.step(pair[1], token))
+
+    def is_equivalent(self):
+        """ Return if both automatas accept the same language """
+
+        parent = {}
+
+        def find(node):
+            parent.setdefault(node, node)
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        start = (self.__left.get_initial(), self.__right.get_initial())
+        parent[find((0, start[0]))] = find((1, start[1]))
+        pending = deque([start])
+
+        while pending:
+            pair = pending.popleft()
+            if self.__differ(pair):
+                return False
+
+            for token in self.__alphabet:
+                new_pair = self.__following(pair, token)
+                left = find((0, new_pair[0]))
+                right = find((1, new_pair[1]))
+                if left != right:
+                    parent[left] = right
+                    pending.append(new_pair)
+
+        return True
+
+    def shortest_counterexample(self):
+        """ Return the shortest string accepted by only one automata, None if there is not """
+
+        start = (self.__left.get_initial(), self.__right.get_initial())
+        previous = {start: None}
+        pending = deque([start])
+
+        while pending:
+            pair = pending.popleft()
+            if self.__differ(pair):
+                tokens = []
+                while previous[pair] is not None:
+                    pair, token = previous[pair]
+                    tokens.append(token)
+                return "".join(reversed(tokens))
+
+            for token in self.__alphabet:
+                new_pair = self.__following(pair, token)
+                if new_pair not in previous:
+                    previous[new_pair] = (pair, token)
+                    pending.append(new_pair)
+
+        return None
+
+    def counterexample(self):
+        """ Return None when both automatas are equivalent, the shortest counterexample otherwise """
+        if self.is_equivalent():
+            return None
+        return self.shortest_counterexample()
@@ -0,0 +1,109 @@
+#!/usr/bin/python
+"""
+ExpresionCache class
+"""
+
+import threading
+from collections import OrderedDict
+
+from core.automata import Automata
+
+class ExpresionCache:
+    """
+    Bounded LRU cache of the automatas built from regular expresions
+    The key is the expresion and the form of the automata:
+    nfa: read_expresion, dfa: to_deterministic, min: minimizete
+    Every get returns one copy so the callers can change the result
+    """
+
+    FORMS = ["nfa", "dfa", "min"]
+
+    def __init__(self, max_size=256):
+        """ Constructor """
+        self.__max_size = max(1, max_size)
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def get_max_size(self):
+        """ Getter """
+        return self.__max_size
+
+    def set_max_size(self, max_size):
+        """ Setter, evict the old entries if there are too much """
+        with self.__lock:
+            self.__max_size = max(1, max_size)
+            self.__evict()
+
+    def stats(self):
+        """ Return the counters of the cache """
+        with self.__lock:
+            return {
+                "hits": self.__hits,
+                "misses": self.__misses,
+                "evictions": self.__evictions,
+                "size": len(self.__entries)
+            }
+
+    def clear(self):
+        """ Remove all the entries and reset the counters """
+        with self.__lock:
+            self.__entries.clear()
+            self.__hits = 0
+            self.__misses = 0
+            self.__evictions = 0
+
+    def __evict(self):
+        """ Remove the least recently used entries over the max size """
+        while len(self.__entries) > self.__max_size:
+            self.__entries.popitem(last=False)
+            self.__evictions += 1
+
+    def __lookup(self, key):
+        """ Return the cached automata of key or None """
+        with self.__lock:
+            automata = self.__entries.get(key)
+            if automata is None:
+                self.__misses += 1
+            else:
+                self.__hits += 1
+                self.__entries.move_to_end(key)
+            return automata
+
+    def __store(self, key, automata):
+        """ Save one automata in the cache """
+        with self.__lock:
+            self.__entries[key] = automata
+            self.__entries.move_to_end(key)
+            self.__evict()
+
+    def __build(self, exp, form):
+        """ Return the cached automata of exp in form, build it when is missing """
+
+        key = (exp, form)
+        automata = self.__lookup(key)
+        if automata is not None:
+            return automata
+
+        if form == "nfa":
+            automata = Automata.read_expresion(exp)
+        elif form == "dfa":
+            automata = self.__build(exp, "nfa").to_deterministic()
+        else:
+            automata = self.__build(exp, "dfa").minimizete()
+
+        self.__store(key, automata)
+        return automata
+
+    def get(self, exp, form="nfa"):
+        """ Return one copy of the automata of the regular expresion exp """
+
+        if form not in ExpresionCache.FORMS:
+            raise ValueError("form parameter must to be [nfa, dfa, min]")
+
+        return self.__build(exp, form).copy()
+
+
+EXPRESION_CACHE = ExpresionCache()
@@ -0,0 +1,78 @@
+#!/usr/bin/python
+"""
+Families class
+"""
+
+import random
+
+from core.automata import Automata
+from core.transition import Transition
+
+class Families:
+    """
+    Generators of parameterized families of automatas and regular expresions
+    Every generator is deterministic for the same parameters and seed,
+    size is the number of states (random) or the parameter n of the family
+    """
+
+    @staticmethod
+    def random_nfa(size, alphabet="ab", density=0.3, epsilon_ratio=0.1, seed=0):
+        """
+        Random non deterministic automata with size states
+        Every (state, token) has one transition to one random state with
+        probability density (and more with the same probability), one
+        epsilon transition is added for every state with probability
+        epsilon_ratio. q0 is the initial state and one quarter of the
+        states are aceptation
+        """
+
+        generator = random.Random(seed)
+        names = ["q{0}".format(i) for i in range(size)]
+
+        automata = Automata()
+        for state in names:
+            for token in alphabet:
+                while generator.random() < density:
+                    target = generator.choice(names)
+                    automata.get_transitions().append(Transition(state, token, target))
+            if generator.random() < epsilon_ratio:
+                target = generator.choice(names)
+                automata.get_transitions().append(Transition(state, "", target))
+
+        # Every state needs at least one transition to keep it in the automata
+        for state in names:
+            if not automata.fetch_transition(state_from=state):
+                token = generator.choice(alphabet)
+                target = generator.choice(names)
+                automata.get_transitions().append(Transition(state, token, target))
+
+        automata.set_initial(names[0])
+        automata.set_aceptation(sorted(generator.sample(names, max(1, size // 4))))
+        automata.build_alphabet()
+        automata.build_states()
+        return automata
+
+    @staticmethod
+    def blowup(size):
+        """ (a+b)*a(a+b)^n, the minimal DFA has 2^(n+1) states """
+        return "(a+b)*a" + "(a+b)" * size
+
+    @staticmethod
+    def chain(size):
+        """ Concatenation of n symbols, abab... """
+        return "".join("ab"[i % 2] for i in range(size))
+
+    @staticmethod
+    def nesting(size):
+        """ n levels of Kleen star, (((ab)*a)*b)*... """
+        exp = "a"
+        for i in range(size):
+            exp = "({0}{1})*".format(exp, "ba"[i % 2])
+        return exp
+
+    @staticmethod
+    def strings(alphabet, count, length, seed=0):
+        """ Return count random strings of the alphabet with at most length chars """
+        generator = random.Random(seed)
+        return ["".join(generator.choice(alphabet) for _ in range(generator.randint(0, length)))
+                for _ in range(count)]
@@ -0,0 +1,93 @@
+#!/usr/bin/python
+"""
+Hopcroft class
+"""
+
+class Hopcroft:
+    """
+    Hopcroft partition refinement over one complete deterministic automata
+    The states are numbered 0..size-1 and the tokens 0..width-1,
+    delta[state * width + token] is the state reached
+    """
+
+    def __init__(self, size, width, delta, aceptation):
+        """ Constructor """
+        self.__size = size
+        self.__width = width
+        self.__delta = delta
+        self.__aceptation = aceptation
+        self.__passes = 0
+        self.__splits = 0
+
+    def get_passes(self):
+        """ Getter, iterations of the refinement loop (one by splitter) of the last blocks call """
+        return self.__passes
+
+    def get_splits(self):
+        """ Getter, number of blocks split by the last blocks call """
+        return self.__splits
+
+    def blocks(self):
+        """ Return the list of blocks of equivalent states, every block is a list of states """
+
+        size = self.__size
+        width = self.__width
+        delta = self.__delta
+
+        # inverse[token][state] = states that goes to state with token
+        inverse = [[[] for _ in range(size)] for _ in range(width)]
+        for state in range(size):
+            for token in range(width):
+                inverse[token][delta[state * width + token]].append(state)
+
+        # Initial partition: aceptation and no aceptation states
+        finals = [state for state in range(size) if state in self.__aceptation]
+        others = [state for state in range(size) if state not in self.__aceptation]
+        members = [set(block) for block in [finals, others] if block]
+        if not members:
+            return []
+        block_of = [0] * size
+        for block, states in enumerate(members):
+            for state in states:
+                block_of[state] = block
+
+        smaller = min(range(len(members)), key=lambda x: len(members[x]))
+        waiting = set((smaller, token) for token in range(width))
+        if len(members) == 1:
+            waiting = set()
+
+        passes = 0
+        splits = 0
+        while waiting:
+            splitter, token = waiting.pop()
+            passes += 1
+
+            # States that goes into the splitter grouped by its block
+            touched = {}
+            for target in list(members[splitter]):
+                for state in inverse[token][target]:
+                    touched.setdefault(block_of[state], []).append(state)
+
+            for block, states in touched.items():
+                if len(states) == len(members[block]):
+                    continue
+
+                # Split the block, the new block keeps the smaller part
+                inside = set(states)
+                outside = members[block] - inside
+                if len(inside) > len(outside):
+                    inside, outside = outside, inside
+
+                new_block = len(members)
+                members[block] = outside
+                members.append(inside)
+                for state in inside:
+                    block_of[state] = new_block
+
+                for one_token in range(width):
+                    waiting.add((new_block, one_token))
+                splits += 1
+
+        self.__passes = passes
+        self.__splits = splits
+        return [sorted(states) for states in members]
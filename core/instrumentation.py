@@ -0,0 +1,216 @@
+#!/usr/bin/python
+"""
+Instrumentation and Phase classes
+"""
+
+import cProfile
+import functools
+import json
+import time
+import tracemalloc
+
+class Instrumentation:
+    """
+    Timings and counters of the phases of the core algorithms
+    One Instrumentation only records while it is enabled as context manager:
+
+        with Instrumentation() as probe:
+            automata.to_deterministic()
+        probe.console_print()
+
+    The names of the phases and counters are the path of the open phases,
+    to_deterministic/subsets is the phase subsets inside to_deterministic.
+    The callbacks receive every event as (kind, name, value), kind is
+    "phase" (value in seconds) or "count"
+    When no Instrumentation is enabled the algorithms only check one empty
+    list, the counters are kept in local variables and reported at the end
+    The counter "passes" of one refinement is the number of iterations of
+    its main loop (one sweep over all the pairs, one splitter of Hopcroft),
+    it is added once with the total when the loop ends, never by iteration
+    """
+
+    ACTIVE = []
+
+    def __init__(self, callback=None):
+        """ Constructor """
+        self.__callbacks = [callback] if callback is not None else []
+        self.__timings = {}
+        self.__counters = {}
+        self.__path = []
+        self.__profile = None
+        self.__snapshot = None
+
+    def __enter__(self):
+        Instrumentation.ACTIVE.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        Instrumentation.ACTIVE.remove(self)
+        return False
+
+    def add_callback(self, callback):
+        """ Add one callback of the events """
+        self.__callbacks.append(callback)
+
+    def get_timings(self):
+        """ Getter, dict of phase -> (calls, seconds) """
+        return dict((name, tuple(value)) for name, value in self.__timings.items())
+
+    def get_counters(self):
+        """ Getter, dict of counter -> value """
+        return dict(self.__counters)
+
+    def get_profile(self):
+        """ Getter, cProfile.Profile of the last profile call """
+        return self.__profile
+
+    def get_snapshot(self):
+        """ Getter, tracemalloc.Snapshot of the last profile call """
+        return self.__snapshot
+
+    def reset(self):
+        """ Forget the timings, counters and profiles """
+        self.__timings = {}
+        self.__counters = {}
+        self.__profile = None
+        self.__snapshot = None
+
+    def open(self, name):
+        """ Start one phase inside the phases already open """
+        self.__path.append(name)
+
+    def close(self, seconds):
+        """ Finish the last phase open with its duration """
+        name = "/".join(self.__path)
+        self.__path.pop()
+        timing = self.__timings.setdefault(name, [0, 0.0])
+        timing[0] += 1
+        timing[1] += seconds
+        for callback in self.__callbacks:
+            callback("phase", name, seconds)
+
+    def add(self, name, value=1):
+        """ Add value to one counter of the actual phase """
+        name = "/".join(self.__path + [name])
+        self.__counters[name] = self.__counters.get(name, 0) + value
+        for callback in self.__callbacks:
+            callback("count", name, value)
+
+    def to_json(self):
+        """ Return the timings and the counters as one dict """
+        return {
+            "phases": dict((name, {"calls": calls, "seconds": seconds})
+                           for name, (calls, seconds) in self.__timings.items()),
+            "counters": self.get_counters()
+        }
+
+    def console_print(self):
+        """ Print in console """
+        print(json.dumps(self.to_json(), indent=4, sort_keys=True))
+
+    def profile(self, function, *args, **kwargs):
+        """
+        Call function enabled with cProfile and tracemalloc and return its result
+        The reports are kept by get_profile/get_snapshot and saved by dump_profile
+        """
+
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+
+        profile = cProfile.Profile()
+        try:
+            with self:
+                profile.enable()
+                try:
+                    result = function(*args, **kwargs)
+                finally:
+                    profile.disable()
+            self.__snapshot = tracemalloc.take_snapshot()
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+
+        self.__profile = profile
+        return result
+
+    def dump_profile(self, profile_filename=None, snapshot_filename=None):
+        """
+        Save the reports of the last profile call, the profile is read by
+        pstats.Stats and the snapshot by tracemalloc.Snapshot.load
+        """
+
+        if self.__profile is None:
+            raise ValueError("There is not one profile call to save")
+
+        if profile_filename is not None:
+            self.__profile.dump_stats(profile_filename)
+        if snapshot_filename is not None:
+            self.__snapshot.dump(snapshot_filename)
+
+    @staticmethod
+    def phase(name):
+        """ Return the context manager of one phase, it does nothing when disabled """
+        if not Instrumentation.ACTIVE:
+            return NO_PHASE
+        return Phase(name)
+
+    @staticmethod
+    def count(name, value=1):
+        """ Add value to one counter of every enabled Instrumentation """
+        for instrumentation in Instrumentation.ACTIVE:
+            instrumentation.add(name, value)
+
+    @staticmethod
+    def operation(function):
+        """ Decorator, every call of function is one phase with its name """
+
+        name = function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not Instrumentation.ACTIVE:
+                return function(*args, **kwargs)
+            with Phase(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+
+class Phase:
+    """
+    Context manager of one phase for the enabled instrumentations
+    """
+
+    def __init__(self, name):
+        """ Constructor """
+        self.__name = name
+        self.__instrumentations = list(Instrumentation.ACTIVE)
+        self.__start = None
+
+    def __enter__(self):
+        for instrumentation in self.__instrumentations:
+            instrumentation.open(self.__name)
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        seconds = time.perf_counter() - self.__start
+        for instrumentation in self.__instrumentations:
+            instrumentation.close(seconds)
+        return False
+
+
+class NoPhase:
+    """
+    Context manager that does nothing, used when instrumentation is disabled
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NO_PHASE = NoPhase()
@@ -0,0 +1,130 @@
+#!/usr/bin/python
+"""
+JsonStream class
+"""
+
+import codecs
+import json
+import os
+import re
+
+class JsonStream:
+    """
+    Incremental reader of one JSON file opened in binary mode
+    Only the consumed part of the file is dropped from the buffer, so the
+    objects and arrays can be iterated one item at a time and the memory
+    is bounded by the biggest item instead of the size of the file
+    """
+
+    WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+    def __init__(self, filex, chunk_size=65536):
+        """ Constructor """
+        self.__file = filex
+        self.__chunk_size = chunk_size
+        self.__decoder = codecs.getincrementaldecoder("utf-8")()
+        self.__json = json.JSONDecoder()
+        self.__buffer = ""
+        self.__position = 0
+        self.__bytes_read = 0
+        self.__eof = False
+        try:
+            self.__size = os.fstat(filex.fileno()).st_size
+        except (AttributeError, OSError, ValueError):
+            self.__size = None
+
+    def get_bytes_read(self):
+        """ Getter, number of bytes read from the file """
+        return self.__bytes_read
+
+    def get_size(self):
+        """ Getter, size of the file in bytes or None when is unknown """
+        return self.__size
+
+    def __fill(self, minimum=0):
+        """ Read the next chunk (at least minimum bytes), return False at the end """
+
+        if self.__eof:
+            return False
+
+        chunk = self.__file.read(max(self.__chunk_size, minimum))
+        self.__bytes_read += len(chunk)
+        if not chunk:
+            self.__eof = True
+        text = self.__decoder.decode(chunk, final=self.__eof)
+        self.__buffer = self.__buffer[self.__position:] + text
+        self.__position = 0
+        return bool(chunk)
+
+    def peek(self):
+        """ Skip the white space and return the next char, "" at the end """
+
+        while True:
+            buffer = self.__buffer
+            position = JsonStream.WHITESPACE.match(buffer, self.__position).end()
+            self.__position = position
+            if position < len(buffer):
+                return buffer[position]
+            if not self.__fill():
+                return ""
+
+    def expect(self, char):
+        """ Consume the next char, it must to be char """
+        if self.peek() != char:
+            raise ValueError("Invalid JSON: expected '{0}' after byte {1}"
+                             .format(char, self.__bytes_read))
+        self.__position += 1
+
+    def value(self):
+        """ Decode and return the next complete JSON value """
+
+        self.peek()
+        while True:
+            try:
+                one_value, end = self.__json.raw_decode(self.__buffer, self.__position)
+                # One number at the end of the buffer can continue in the next chunk
+                if end < len(self.__buffer) or self.__eof:
+                    self.__position = end
+                    return one_value
+            except ValueError:
+                if self.__eof:
+                    raise ValueError("Invalid JSON after byte {0}".format(self.__bytes_read))
+            # Read at least the pending size again, so one big value is linear
+            self.__fill(len(self.__buffer) - self.__position)
+
+    def iterate_array(self):
+        """ Iterate the values of the next array """
+
+        self.expect("[")
+        if self.peek() == "]":
+            self.__position += 1
+            return
+
+        while True:
+            yield self.value()
+            if self.peek() == "]":
+                self.__position += 1
+                return
+            self.expect(",")
+
+    def iterate_object(self):
+        """
+        Iterate the keys of the next object, the caller must consume
+        the value of every key before continue the iteration
+        """
+
+        self.expect("{")
+        if self.peek() == "}":
+            self.__position += 1
+            return
+
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise ValueError("Invalid JSON: the keys must to be strings")
+            self.expect(":")
+            yield key
+            if self.peek() == "}":
+                self.__position += 1
+                return
+            self.expect(",")
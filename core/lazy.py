@@ -0,0 +1,124 @@
+#!/usr/bin/python
+"""
+LazyDFA class
+"""
+
+import sys
+from collections import OrderedDict
+
+from core.bitset import BitSimulation
+
+class LazyDFA:
+    """
+    Deterministic automata built on the fly over one BitSimulation
+    Every set of states reached by the input is one row of the cache with
+    the transitions already computed from it, the rows are evicted in LRU
+    order when the cache has more than max_states rows or max_bytes bytes
+    One missing transition is computed again with the simulation
+    """
+
+    def __init__(self, automata, max_states=4096, max_bytes=None):
+        """ Constructor """
+        self.__simulation = BitSimulation(automata)
+        self.__max_states = max(2, max_states)
+        self.__max_bytes = max_bytes
+        self.__cache = OrderedDict()
+        self.__bytes = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def get_simulation(self):
+        """ Getter """
+        return self.__simulation
+
+    def stats(self):
+        """ Return the counters of the cache """
+        return {
+            "hits": self.__hits,
+            "misses": self.__misses,
+            "evictions": self.__evictions,
+            "states": len(self.__cache),
+            "bytes": self.__bytes
+        }
+
+    def clear(self):
+        """ Remove all the rows of the cache and reset the counters """
+        self.__cache.clear()
+        self.__bytes = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def __row(self, mask):
+        """ Return the row of mask, create it and evict old rows when is needed """
+
+        cache = self.__cache
+        row = cache.get(mask)
+        if row is not None:
+            cache.move_to_end(mask)
+            return row
+
+        while cache and (len(cache) >= self.__max_states or \
+              (self.__max_bytes is not None and self.__bytes >= self.__max_bytes)):
+            old_mask, old_row = cache.popitem(last=False)
+            self.__bytes -= sys.getsizeof(old_mask) + sys.getsizeof(old_row)
+            self.__evictions += 1
+
+        row = {}
+        cache[mask] = row
+        self.__bytes += sys.getsizeof(mask) + sys.getsizeof(row)
+        return row
+
+    def get_initial(self):
+        """ Return the initial mask """
+        return self.__simulation.get_initial()
+
+    def step(self, mask, token):
+        """ Return the mask reached from mask reading one token """
+        row = self.__row(mask)
+        new_mask = row.get(token)
+        if new_mask is None:
+            self.__misses += 1
+            new_mask = self.__simulation.step(mask, token)
+            size = sys.getsizeof(row)
+            row[token] = new_mask
+            self.__bytes += sys.getsizeof(row) - size
+        else:
+            self.__hits += 1
+        return new_mask
+
+    def run(self, mask, one_string):
+        """ Return the mask reached from mask reading one_string """
+
+        simulation = self.__simulation
+        row = self.__row(mask)
+        hits = 0
+        for token in one_string:
+            new_mask = row.get(token)
+            if new_mask is None:
+                self.__misses += 1
+                new_mask = simulation.step(mask, token)
+                size = sys.getsizeof(row)
+                row[token] = new_mask
+                self.__bytes += sys.getsizeof(row) - size
+            else:
+                hits += 1
+            mask = new_mask
+            row = self.__row(mask)
+
+        self.__hits += hits
+        return mask
+
+    def is_aceptation(self, mask):
+        """ Return if the mask contains one aceptation state """
+        return self.__simulation.is_aceptation(mask)
+
+    @staticmethod
+    def is_dead(mask):
+        """ Return if the mask can not reach any state """
+        return mask == 0
+
+    def state_names(self, mask):
+        """ Return the sorted list of names of the mask """
+        return self.__simulation.state_names(mask)
@@ -0,0 +1,135 @@
+#!/usr/bin/python
+"""
+Lexer class
+"""
+
+from core.pattern_set import PatternSet
+
+class Lexer:
+    """
+    Maximal munch tokenizer of one ordered list of (token_name, regex) rules
+    The rules are joined in one PatternSet, its lazy deterministic product
+    tags every state with the rules in aceptation. Every token is the
+    longest prefix of the input accepted by one rule, between the rules
+    that accept the same prefix the first one wins
+    The input can be given by chunks, only the text from the start of the
+    actual token is kept so one file is never loaded at once
+    The empty lexemes are never produced, one input that no rule accepts
+    raises ValueError with its offset
+    """
+
+    def __init__(self, rules, ignore=(), max_states=10000):
+        """
+        Constructor, rules is the list of (token_name, regex or Automata),
+        the tokens with one name of ignore are not returned
+        """
+
+        rules = list(rules)
+        if not rules:
+            raise ValueError("Lexer needs at least one rule")
+
+        self.__names = [name for name, _ in rules]
+        self.__ignore = frozenset(ignore)
+        self.__patterns = PatternSet([pattern for _, pattern in rules], max_states)
+
+    def get_names(self):
+        """ Getter, names of the rules in order """
+        return list(self.__names)
+
+    def get_patterns(self):
+        """ Getter, PatternSet of the rules """
+        return self.__patterns
+
+    def tokenize(self, text):
+        """ Iterate the (token_name, lexeme, offset) of one string """
+        return self.tokenize_chunks([text])
+
+    def tokenize_file(self, filename, chunk_size=65536, encoding="utf-8"):
+        """ Iterate the (token_name, lexeme, offset) of one file read by chunks """
+
+        def chunks():
+            with open(filename, encoding=encoding, newline="") as filex:
+                while True:
+                    chunk = filex.read(chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+
+        return self.tokenize_chunks(chunks())
+
+    def tokenize_chunks(self, chunks):
+        """
+        Iterate the (token_name, lexeme, offset) of the input given by one
+        iterable of strings, the offsets count chars from the first chunk
+        """
+
+        patterns = self.__patterns
+        names = self.__names
+        ignore = self.__ignore
+        chunks = iter(chunks)
+
+        buffer = ""
+        base = 0
+        start = 0
+        eof = False
+
+        while True:
+            if start == len(buffer):
+                if eof:
+                    return
+                base += start
+                buffer = next(chunks, None)
+                start = 0
+                if buffer is None:
+                    buffer = ""
+                    eof = True
+                continue
+
+            # Longest match from start, the last aceptation keeps its first rule
+            rows = patterns.get_rows()
+            tags = patterns.get_tags()
+            dead = patterns.get_dead()
+            state = patterns.get_initial()
+            position = start
+            end = -1
+            rule = None
+            while True:
+                size = len(buffer)
+                for position in range(position, size):
+                    new_state = rows[state].get(buffer[position])
+                    if new_state is None:
+                        new_state = patterns.step(state, buffer[position])
+                        rows = patterns.get_rows()
+                        tags = patterns.get_tags()
+                        dead = patterns.get_dead()
+                    if new_state == dead:
+                        break
+                    state = new_state
+                    if tags[state]:
+                        end = position + 1
+                        rule = tags[state][0]
+                else:
+                    # The token can continue in the next chunk
+                    chunk = None if eof else next(chunks, None)
+                    if chunk is None:
+                        eof = True
+                        break
+
+                    # Keep only the text of the actual token
+                    buffer = buffer[start:] + chunk
+                    base += start
+                    position = size - start
+                    if end != -1:
+                        end -= start
+                    start = 0
+                    continue
+                break
+
+            if end == -1:
+                raise ValueError("Unexpected input {0!r} at offset {1}"
+                                 .format(buffer[start:start + 16], base + start))
+
+            name = names[rule]
+            if name not in ignore:
+                yield (name, buffer[start:end], base + start)
+            start = end
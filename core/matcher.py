@@ -0,0 +1,251 @@
+#!/usr/bin/python
+"""
+Matcher class
+"""
+
+from array import array
+
+from core.symbol_table import SymbolView
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class Matcher:
+    """
+    Immutable matcher of one deterministic automata
+    The states are numbered and the transitions are stored in one flat table,
+    every cell keeps the offset of the row of the target state so one step
+    is only one lookup: state = table[state + column]
+    The last row is the dead state and the last column is used by the
+    tokens that are not in the alphabet
+    """
+
+    def __init__(self, states, alphabet, table, initial, aceptation):
+        """ Constructor, states can be one SymbolView to create the names when are needed """
+        if not isinstance(states, SymbolView):
+            states = tuple(states)
+        self.__states = states
+        self.__alphabet = tuple(alphabet)
+        self.__width = len(self.__alphabet) + 1
+        self.__columns = dict((token, i) for i, token in enumerate(self.__alphabet))
+        self.__table = table
+        self.__initial = initial * self.__width
+        self.__dead = len(self.__states) * self.__width
+        self.__aceptation = bytearray(len(self.__states) + 1)
+        for state in aceptation:
+            self.__aceptation[state] = 1
+        self.__vectors = None
+
+    @staticmethod
+    def from_automata(automata):
+        """ Create the matcher from one automata, the automata must to be deterministic """
+
+        transitions, states, _, initial, aceptation = automata.to_numbers()
+        names = transitions.get_states_table()
+        tokens = transitions.get_tokens_table()
+
+        states = list(states)
+        known = set(states)
+        for state in [initial] + aceptation:
+            if state not in known:
+                known.add(state)
+                states.append(state)
+
+        alphabet = []
+        columns = {}
+        for state_from, token, state_to in transitions.iterate_numbers():
+            for state in [state_from, state_to]:
+                if state not in known:
+                    known.add(state)
+                    states.append(state)
+            if token not in columns:
+                columns[token] = len(alphabet)
+                alphabet.append(token)
+
+        if tokens.find("") in columns:
+            raise ValueError("Automata must to be deterministic")
+
+        numbers = dict((state, i) for i, state in enumerate(states))
+        width = len(alphabet) + 1
+        dead = len(states) * width
+
+        table = array("l", [dead]) * ((len(states) + 1) * width)
+        filled = bytearray(len(table))
+        for state_from, token, state_to in transitions.iterate_numbers():
+            cell = numbers[state_from] * width + columns[token]
+            target = numbers[state_to] * width
+            if filled[cell] and table[cell] != target:
+                raise ValueError("Automata must to be deterministic")
+            table[cell] = target
+            filled[cell] = 1
+
+        aceptation = [numbers[state] for state in aceptation]
+        return Matcher(names.view(states), [tokens.name(token) for token in alphabet],
+                       table, numbers[initial], aceptation)
+
+    def __reduce__(self):
+        """
+        Pickle the names, the table and the aceptation states by number, one
+        table over one mapped file is copied to one array
+        """
+        size = len(self.__states)
+        table = self.__table
+        if isinstance(table, memoryview):
+            table = array("q", table.tobytes())
+        return (Matcher, (list(self.__states), self.__alphabet, table,
+                          self.__initial // self.__width,
+                          [state for state in range(size) if self.__aceptation[state]]))
+
+    def get_states(self):
+        """ Getter """
+        return self.__states
+
+    def get_alphabet(self):
+        """ Getter """
+        return self.__alphabet
+
+    def get_width(self):
+        """ Getter """
+        return self.__width
+
+    def get_table(self):
+        """ Getter """
+        return self.__table
+
+    def get_initial(self):
+        """ Getter, offset of the initial row """
+        return self.__initial
+
+    def get_dead(self):
+        """ Getter, offset of the dead row """
+        return self.__dead
+
+    def column(self, token):
+        """ Return the column of one token """
+        return self.__columns.get(token, self.__width - 1)
+
+    def step(self, state, token):
+        """ Return the offset of the row reached from the row state with token """
+        return self.__table[state + self.__columns.get(token, self.__width - 1)]
+
+    def is_aceptation(self, state):
+        """ Return if the row offset state is one aceptation state """
+        return self.__aceptation[state // self.__width] == 1
+
+    def is_dead(self, state):
+        """ Return if the row offset state is the dead state """
+        return state == self.__dead
+
+    def state_name(self, state):
+        """ Return the name of the row offset state, None for the dead state """
+        if state == self.__dead:
+            return None
+        return self.__states[state // self.__width]
+
+    def state_names(self, state):
+        """ Return the list of names of the row offset state """
+        if state == self.__dead:
+            return []
+        return [self.__states[state // self.__width]]
+
+    def live(self):
+        """
+        Return one bytearray with 1 for every state (by number, not offset)
+        that can reach one aceptation state, the dead state is never live
+        """
+
+        size = len(self.__states)
+        width = self.__width
+        inverse = [[] for _ in range(size + 1)]
+        for state in range(size):
+            for column in range(width):
+                inverse[self.__table[state * width + column] // width].append(state)
+
+        live = bytearray(size + 1)
+        pending = [state for state in range(size) if self.__aceptation[state]]
+        for state in pending:
+            live[state] = 1
+        while pending:
+            for state in inverse[pending.pop()]:
+                if not live[state]:
+                    live[state] = 1
+                    pending.append(state)
+        return live
+
+    def run(self, state, one_string):
+        """ Return the row offset reached from the row state reading one_string """
+        table = self.__table
+        columns = self.__columns
+        unknown = self.__width - 1
+        for token in one_string:
+            state = table[state + columns.get(token, unknown)]
+        return state
+
+    def match(self, one_string):
+        """ Return if the one_string is accepted """
+        state = self.run(self.__initial, one_string)
+        return self.__aceptation[state // self.__width] == 1
+
+    def __build_vectors(self):
+        """ Build the NumPy version of the table, the columns and the aceptation """
+
+        # Map every code point of the one-char tokens to its column,
+        # the last cell is used by all the code points out of the range
+        unknown = self.__width - 1
+        points = [ord(token) for token in self.__alphabet if len(token) == 1]
+        lookup = numpy.full(max(points + [0]) + 2, unknown, dtype=numpy.int64)
+        for token, column in self.__columns.items():
+            if len(token) == 1:
+                lookup[ord(token)] = column
+
+        table = numpy.asarray(self.__table, dtype=numpy.int64)
+        aceptation = numpy.frombuffer(bytes(self.__aceptation), dtype=numpy.uint8) == 1
+        self.__vectors = (lookup, table, aceptation)
+
+    def match_many(self, strings, block=65536):
+        """
+        Return one NumPy bool array with the result of match for every string
+        All the strings of one block advance one position at a time with array
+        lookups, the strings are sorted by length so the strings still active
+        are always the first ones of the block
+        Without NumPy installed the result is a list of bool
+        """
+
+        if numpy is None:
+            return [self.match(one_string) for one_string in strings]
+
+        if self.__vectors is None:
+            self.__build_vectors()
+        lookup, table, aceptation = self.__vectors
+
+        strings = list(strings)
+        result = numpy.zeros(len(strings), dtype=bool)
+        for begin in range(0, len(strings), block):
+            part = strings[begin:begin + block]
+
+            lengths = numpy.fromiter(map(len, part), dtype=numpy.int64, count=len(part))
+            order = numpy.argsort(-lengths, kind="stable")
+            lengths = lengths[order]
+            offsets = numpy.zeros(len(part), dtype=numpy.int64)
+            numpy.cumsum(lengths[:-1], out=offsets[1:])
+
+            # Code points of all the strings of the block mapped to columns
+            text = "".join(part[i] for i in order)
+            points = numpy.frombuffer(text.encode("utf-32-le"), dtype=numpy.uint32)
+            points = numpy.minimum(points, len(lookup) - 1)
+            columns = lookup[points]
+
+            states = numpy.full(len(part), self.__initial, dtype=numpy.int64)
+            active = len(part)
+            for position in range(int(lengths[0]) if len(part) else 0):
+                while lengths[active - 1] <= position:
+                    active -= 1
+                current = states[:active]
+                current += columns[offsets[:active] + position]
+                states[:active] = table[current]
+
+            result[begin + order] = aceptation[states // self.__width]
+
+        return result
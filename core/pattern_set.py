@@ -0,0 +1,138 @@
+#!/usr/bin/python
+"""
+PatternSet class
+"""
+
+from core.automata import Automata
+from core.product import Product
+
+class PatternSet:
+    """
+    Match one string against many patterns in one pass
+    The patterns (automatas or regular expresions) are compiled to Matchers
+    and joined in one Product of N components, the product is deterministic
+    and every state is tagged with the ids of the patterns in aceptation.
+    The product is built lazily: one state and one transition are created
+    the first time the input reaches them, the components that can not
+    reach one aceptation are moved to their dead state so the states with
+    the same future share one id
+    When there are more than max_states states the cache is flushed and
+    the product is built again from the actual state
+    """
+
+    def __init__(self, patterns, max_states=10000):
+        """ Constructor, the id of every pattern is its index in patterns """
+
+        matchers = []
+        for pattern in patterns:
+            if not isinstance(pattern, Automata):
+                pattern = Automata.read_expresion(pattern)
+            matchers.append(pattern.compile())
+
+        self.__product = Product(matchers)
+        self.__size = len(matchers)
+        self.__max_states = max(2, max_states)
+        self.__flushes = 0
+        self.__misses = 0
+        self.__flush()
+
+    def __flush(self):
+        """ Forget all the states, only the initial and the dead states are kept """
+        self.__ids = {}
+        self.__states = []
+        self.__rows = []
+        self.__tags = []
+        self.__initial = self.__identify(self.__product.trim(self.__product.get_initial()))
+        self.__dead = self.__identify(self.__product.get_dead())
+
+    def __identify(self, states):
+        """ Return the id of one tuple of states, it is created when is new """
+        number = self.__ids.get(states)
+        if number is None:
+            number = len(self.__states)
+            self.__ids[states] = number
+            self.__states.append(states)
+            self.__rows.append({})
+            self.__tags.append(self.__product.tags(states))
+        return number
+
+    def step(self, number, token):
+        """
+        Return the id of the state reached from the state number with token,
+        the transition is created when is new. One flush changes all the
+        ids, so the lists of get_rows/get_tags must to be read again
+        """
+
+        new_number = self.__rows[number].get(token)
+        if new_number is not None:
+            return new_number
+
+        self.__misses += 1
+        states = self.__product.trim(self.__product.step(self.__states[number], token))
+        if states not in self.__ids and len(self.__states) >= self.__max_states:
+            self.__flushes += 1
+            self.__flush()
+            return self.__identify(states)
+
+        new_number = self.__identify(states)
+        self.__rows[number][token] = new_number
+        return new_number
+
+    def get_size(self):
+        """ Getter, number of patterns """
+        return self.__size
+
+    def get_initial(self):
+        """ Getter, id of the initial state """
+        return self.__initial
+
+    def get_dead(self):
+        """ Getter, id of the state where no pattern can accept """
+        return self.__dead
+
+    def get_rows(self):
+        """ Getter, list of dicts token -> id of the transitions created by state id """
+        return self.__rows
+
+    def get_tags(self):
+        """ Getter, list of the tuples of pattern ids in aceptation by state id """
+        return self.__tags
+
+    def stats(self):
+        """ Return the counters of the lazy product """
+        return {
+            "states": len(self.__states),
+            "transitions": sum(map(len, self.__rows)),
+            "misses": self.__misses,
+            "flushes": self.__flushes
+        }
+
+    def run(self, one_string):
+        """ Return the id of the product state reached reading one_string """
+
+        state = self.__initial
+        dead = self.__dead
+        rows = self.__rows
+        for token in one_string:
+            new_state = rows[state].get(token)
+            if new_state is None:
+                new_state = self.step(state, token)
+                rows = self.__rows
+                dead = self.__dead
+            state = new_state
+            if state == dead:
+                break
+        return state
+
+    def match(self, one_string):
+        """ Return the sorted tuple of the ids of the patterns that accept one_string """
+        state = self.run(one_string)
+        return self.__tags[state]
+
+    def match_any(self, one_string):
+        """ Return if one of the patterns accept one_string """
+        return bool(self.match(one_string))
+
+    def match_many(self, strings):
+        """ Return the list of tuples of ids of the patterns that accept every string """
+        return [self.match(one_string) for one_string in strings]
@@ -0,0 +1,161 @@
+#!/usr/bin/python
+"""
+Product class
+"""
+
+from collections import deque
+
+class Product:
+    """
+    Product automata of many Matchers explored from the initial states
+    Every product state is one tuple with the state number of every
+    component, the tuple is encoded as one integer key (mixed radix) and
+    mapped to one dense id. One missing transition of one component goes
+    to its dead state, so the components do not need to be complete
+    The tags of one product state are the indexes of the components in
+    aceptation, the merge decides with them which states are aceptation
+    The product can be explored at once with build or one state at a time
+    with step
+    """
+
+    def __init__(self, matchers, alive=None):
+        """
+        Constructor
+        alive receive the tuple of live flags of the components and return
+        if the product state can still reach one aceptation, the states that
+        are not alive are joined into one only sink state
+        """
+
+        self.__matchers = list(matchers)
+        self.__alive = alive
+
+        alphabet = set()
+        for matcher in self.__matchers:
+            alphabet.update(matcher.get_alphabet())
+        self.__alphabet = sorted(alphabet)
+        self.__index = dict((token, i) for i, token in enumerate(self.__alphabet))
+
+        # following[i][state][token] = state of the component i
+        self.__following = []
+        self.__radix = []
+        self.__lives = []
+        radix = 1
+        for matcher in self.__matchers:
+            width = matcher.get_width()
+            table = matcher.get_table()
+            size = len(matcher.get_states())
+            columns = [matcher.column(token) for token in self.__alphabet]
+            following = []
+            for state in range(size + 1):
+                base = state * width
+                following.append([table[base + column] // width for column in columns])
+            self.__following.append(following)
+            self.__radix.append(radix)
+            self.__lives.append(matcher.live() if alive is not None else None)
+            radix *= size + 1
+        self.__dead = tuple(len(matcher.get_states()) for matcher in self.__matchers)
+
+    def get_alphabet(self):
+        """ Getter """
+        return self.__alphabet
+
+    def get_initial(self):
+        """ Getter, tuple of the initial states of the components """
+        return tuple(matcher.get_initial() // matcher.get_width() for matcher in self.__matchers)
+
+    def get_dead(self):
+        """ Getter, tuple of the dead states of the components """
+        return self.__dead
+
+    def step(self, states, token):
+        """ Return the tuple of states reached from states reading one token """
+        column = self.__index.get(token)
+        if column is None:
+            return self.__dead
+        following = self.__following
+        return tuple(following[i][state][column] for i, state in enumerate(states))
+
+    def trim(self, states):
+        """
+        Return states with the dead state in the components that can not
+        reach one aceptation, so the product states with the same future
+        tags are the same tuple
+        """
+        for i, matcher in enumerate(self.__matchers):
+            if self.__lives[i] is None:
+                self.__lives[i] = matcher.live()
+        return tuple(state if self.__lives[i][state] else self.__dead[i]
+                     for i, state in enumerate(states))
+
+    def __is_alive(self, states):
+        """ Return if the product state can reach one aceptation """
+        if self.__alive is None:
+            return True
+        flags = tuple(self.__lives[i][state] == 1 for i, state in enumerate(states))
+        return self.__alive(flags)
+
+    def state_name(self, states):
+        """ Return the comma-joined name of one product state, None for the sink """
+        if states is None:
+            return None
+        names = []
+        for matcher, state in zip(self.__matchers, states):
+            if state == len(matcher.get_states()):
+                names.append("empty")
+            else:
+                names.append(matcher.get_states()[state])
+        return ",".join(names)
+
+    def tags(self, states):
+        """ Return the tuple of indexes of the components in aceptation """
+        tags = []
+        for i, (matcher, state) in enumerate(zip(self.__matchers, states)):
+            if state != len(matcher.get_states()) and \
+               matcher.is_aceptation(state * matcher.get_width()):
+                tags.append(i)
+        return tuple(tags)
+
+    def build(self):
+        """
+        Explore the product with one BFS worklist
+        Return (states, transitions), states is the list of tuples by id
+        (None for the sink) and transitions the list of (id, token, id)
+        """
+
+        radix = self.__radix
+        following = self.__following
+        tokens = range(len(self.__alphabet))
+
+        start = self.get_initial()
+        ids = {}
+        states = []
+        transitions = []
+        sink = []
+
+        def identify(one_states):
+            if not self.__is_alive(one_states):
+                if not sink:
+                    sink.append(len(states))
+                    states.append(None)
+                    for token in self.__alphabet:
+                        transitions.append((sink[0], token, sink[0]))
+                return sink[0]
+
+            key = sum(state * radix[i] for i, state in enumerate(one_states))
+            if key not in ids:
+                ids[key] = len(states)
+                states.append(one_states)
+                pending.append(ids[key])
+            return ids[key]
+
+        pending = deque()
+        identify(start)
+
+        while pending:
+            current = pending.popleft()
+            current_states = states[current]
+            for token in tokens:
+                new_states = tuple(following[i][state][token] for i, state in enumerate(current_states))
+                transitions.append((current, self.__alphabet[token], identify(new_states)))
+
+        return (states, transitions)
@@ -0,0 +1,174 @@
+#!/usr/bin/python
+"""
+Searcher class
+"""
+
+from array import array
+
+from core.bitset import BitSimulation
+
+class Searcher:
+    """
+    Unanchored search of the matches of one automata inside one text
+    The matches are leftmost-longest and do not overlap, the empty matches
+    are not reported.
+    The text is read once backward with the reversed automata, one new
+    thread starts after every char with the position where its match ends.
+    The threads in the same state have the same future, so only the one
+    with the biggest end is kept: when one thread reaches the aceptation
+    on i its end is the end of the longest match that starts on i.
+    The threads with the same end are kept as one group (one bitmask of
+    the reversed automata), the tuple of groups in order of end is one
+    state of one deterministic automata built lazily like PatternSet, every
+    transition keeps where the end of every new group comes from, so one
+    step is one lookup and one copy of the ends of the groups
+    Then the spans are taken from left to right in one linear walk
+    The whole text is needed since the longest end of one match is only
+    known reading until the end of the text, so there is not one search
+    over chunks. The backward pass keeps one int64 by char of the text (8
+    bytes by char) and it is finished before finditer yields the first
+    span, so the iteration is not lazy: search also reads the whole text
+    """
+
+    def __init__(self, automata, max_states=4096):
+        """ Constructor """
+        self.__simulation = BitSimulation(automata.reverse())
+        self.__max_states = max(2, max_states)
+        self.__flushes = 0
+        self.__misses = 0
+        self.__flush()
+
+    def __flush(self):
+        """ Forget all the states, only the state without groups is kept """
+        self.__ids = {}
+        self.__states = []
+        self.__rows = []
+        self.__empty = self.__identify(())
+
+    def __identify(self, groups):
+        """ Return the id of one tuple of groups, it is created when is new """
+        number = self.__ids.get(groups)
+        if number is None:
+            number = len(self.__states)
+            self.__ids[groups] = number
+            self.__states.append(groups)
+            self.__rows.append({})
+        return number
+
+    def step(self, number, token):
+        """
+        Return the transition (id, size, sources, aceptation) from the state
+        number reading one token after one new group starts. size is the
+        number of new groups, sources the tuple of the index of the old group
+        of every new group (the new group is the last index) or None when they
+        are the first size groups, aceptation is the index of the first group
+        in aceptation or -1
+        One flush changes all the ids, so get_rows must to be read again
+        """
+
+        transition = self.__rows[number].get(token)
+        if transition is not None:
+            return transition
+
+        self.__misses += 1
+        simulation = self.__simulation
+        groups = self.__states[number] + (simulation.get_initial(),)
+        seen = 0
+        new_groups = []
+        sources = []
+        aceptation = -1
+        for index, group in enumerate(groups):
+            group = simulation.step(group, token) & ~seen
+            if group:
+                seen |= group
+                if aceptation == -1 and simulation.is_aceptation(group):
+                    aceptation = len(new_groups)
+                new_groups.append(group)
+                sources.append(index)
+
+        new_groups = tuple(new_groups)
+        sources = tuple(sources)
+        if sources == tuple(range(len(sources))):
+            sources = None
+
+        if new_groups not in self.__ids and len(self.__states) >= self.__max_states:
+            self.__flushes += 1
+            self.__flush()
+            return (self.__identify(new_groups), len(new_groups), sources, aceptation)
+
+        transition = (self.__identify(new_groups), len(new_groups), sources, aceptation)
+        self.__rows[number][token] = transition
+        return transition
+
+    def get_simulation(self):
+        """ Getter, BitSimulation of the reversed automata """
+        return self.__simulation
+
+    def get_rows(self):
+        """ Getter, list of dicts token -> transition created by state id """
+        return self.__rows
+
+    def stats(self):
+        """ Return the counters of the lazy automata """
+        return {
+            "states": len(self.__states),
+            "transitions": sum(map(len, self.__rows)),
+            "misses": self.__misses,
+            "flushes": self.__flushes
+        }
+
+    def longest_ends(self, text):
+        """
+        Return one array with the end of the longest match that starts on
+        every position of the text, 0 where no match starts
+        The array has one int64 by char, 8 * len(text) bytes
+        """
+
+        longest = array("q", [0]) * len(text)
+        rows = self.__rows
+        state = self.__empty
+        ends = []
+        for position in range(len(text) - 1, -1, -1):
+            token = text[position]
+            transition = rows[state].get(token)
+            if transition is None:
+                transition = self.step(state, token)
+                rows = self.__rows
+            state, size, sources, aceptation = transition
+
+            ends.append(position + 1)
+            if sources is not None:
+                ends = [ends[index] for index in sources]
+            else:
+                del ends[size:]
+            if aceptation != -1:
+                longest[position] = ends[aceptation]
+        return longest
+
+    def finditer(self, text):
+        """
+        Iterate the (start, end) spans of the matches of the text, text[start:end]
+        The whole text is read backward by longest_ends before the first
+        span, so one break after the first spans does not save the pass
+        """
+
+        longest = self.longest_ends(text)
+        position = 0
+        size = len(text)
+        while position < size:
+            end = longest[position]
+            if end:
+                yield (position, end)
+                position = end
+            else:
+                position += 1
+
+    def findall(self, text):
+        """ Return the list of (start, end) spans of the matches of the text """
+        return list(self.finditer(text))
+
+    def search(self, text):
+        """ Return the first (start, end) span of the text, None if there is not """
+        for span in self.finditer(text):
+            return span
+        return None
@@ -0,0 +1,81 @@
+#!/usr/bin/python
+"""
+SetSimulation class
+"""
+
+class SetSimulation:
+    """
+    Simulation of one automata keeping the actual states as one frozenset
+    Works for deterministic and non deterministic automatas with epsilon
+    transitions, every set is already closed by the epsilon cerradure
+    The closures and steps of every state are memoized on demand,
+    the automata must not change while the simulation is used
+    """
+
+    def __init__(self, automata):
+        """ Constructor """
+        self.__automata = automata
+        self.__aceptation = frozenset(automata.get_aceptation())
+        self.__closures = {}
+        self.__steps = {}
+
+    def closure(self, one_state):
+        """ Return the epsilon cerradure of one state as frozenset """
+
+        if one_state in self.__closures:
+            return self.__closures[one_state]
+
+        closure = self.__automata.epsilon_cerradure(one_state)
+        closure = frozenset(closure)
+        self.__closures[one_state] = closure
+        return closure
+
+    def __successors(self, one_state, token):
+        """ Return the closed set reached from one state with token """
+
+        key = (one_state, token)
+        if key in self.__steps:
+            return self.__steps[key]
+
+        successors = set()
+        for trans in self.__automata.fetch_transition(one_state, token):
+            successors |= self.closure(trans.get_state_to())
+
+        successors = frozenset(successors)
+        self.__steps[key] = successors
+        return successors
+
+    def get_initial(self):
+        """ Return the initial set """
+        return self.closure(self.__automata.get_initial())
+
+    def step(self, states, token):
+        """ Return the set reached from the set states reading one token """
+        if len(states) == 1:
+            for state in states:
+                return self.__successors(state, token)
+        new_states = set()
+        for state in states:
+            new_states |= self.__successors(state, token)
+        return frozenset(new_states)
+
+    def run(self, states, one_string):
+        """ Return the set reached from the set states reading one_string """
+        step = self.step
+        for token in one_string:
+            states = step(states, token)
+        return states
+
+    def is_aceptation(self, states):
+        """ Return if the set contains one aceptation state """
+        return not self.__aceptation.isdisjoint(states)
+
+    @staticmethod
+    def is_dead(states):
+        """ Return if the set can not reach any state """
+        return not states
+
+    @staticmethod
+    def state_names(states):
+        """ Return the sorted list of names of the set """
+        return sorted(states)
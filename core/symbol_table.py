@@ -0,0 +1,115 @@
+#!/usr/bin/python
+"""
+SymbolTable and SymbolView classes
+"""
+
+try:
+    from collections.abc import Sequence
+except ImportError:
+    from collections import Sequence
+
+class SymbolTable:
+    """
+    Dense numbering of names, every name has one number from 0 and the
+    numbers never change. The names of one block of numbers can be deferred:
+    one resolver returns the names of the whole block and it is only called
+    the first time one of those names (or one number by name) is requested
+    """
+
+    def __init__(self, names=()):
+        """ Constructor """
+        self.__names = []
+        self.__numbers = {}
+        self.__deferred = []
+        for name in names:
+            self.number(name)
+
+    def __len__(self):
+        return len(self.__names)
+
+    def defer(self, count, resolver):
+        """
+        Add count numbers without name, resolver() must to return the list
+        of the count names when they are requested, return the first number
+        """
+        first = len(self.__names)
+        self.__names.extend([None] * count)
+        if count:
+            self.__deferred.append((first, count, resolver))
+        return first
+
+    def is_deferred(self):
+        """ Return if there are names still not resolved """
+        return bool(self.__deferred)
+
+    def resolve(self):
+        """ Resolve the names of all the deferred blocks """
+        while self.__deferred:
+            first, count, resolver = self.__deferred.pop(0)
+            names = resolver()
+            if len(names) != count:
+                raise ValueError("Resolver must to return {0} names".format(count))
+            for number, name in enumerate(names, first):
+                self.__names[number] = name
+                self.__numbers.setdefault(name, number)
+
+    def number(self, name):
+        """ Return the number of one name, add it when is new """
+        if self.__deferred:
+            self.resolve()
+        number = self.__numbers.get(name)
+        if number is None:
+            number = len(self.__names)
+            self.__numbers[name] = number
+            self.__names.append(name)
+        return number
+
+    def find(self, name):
+        """ Return the number of one name or None when is missing """
+        if self.__deferred:
+            self.resolve()
+        return self.__numbers.get(name)
+
+    def name(self, number):
+        """ Return the name of one number """
+        name = self.__names[number]
+        if name is None and self.__deferred:
+            self.resolve()
+            name = self.__names[number]
+        return name
+
+    def view(self, numbers):
+        """ Return one SymbolView of the names of numbers """
+        return SymbolView(self, numbers)
+
+
+class SymbolView(Sequence):
+    """
+    Read only sequence of the names of some numbers of one SymbolTable,
+    the names are only resolved when they are read
+    """
+
+    def __init__(self, table, numbers):
+        """ Constructor """
+        self.__table = table
+        self.__numbers = tuple(numbers)
+
+    def get_numbers(self):
+        """ Getter """
+        return self.__numbers
+
+    def __len__(self):
+        return len(self.__numbers)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.__table.name(number) for number in self.__numbers[index]]
+        return self.__table.name(self.__numbers[index])
+
+    def __iter__(self):
+        name = self.__table.name
+        for number in self.__numbers:
+            yield name(number)
+
+    def __repr__(self):
+        return "SymbolView({0!r})".format(list(self))
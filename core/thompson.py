@@ -0,0 +1,155 @@
+#!/usr/bin/python
+"""
+Thompson class
+"""
+
+class Thompson:
+    """
+    Thompson construction of one regular expresion in one pass
+    The operators are union "+", Kleen star "*", concatenation "." (also
+    implicit between two operands) and parentheses, any other char is one
+    symbol. The states are integers and the automata is only converted to
+    names at the end, every operator adds at most two states
+    """
+
+    OPERATORS = ["+", "*", "(", ")", "."]
+    PRIORITY = {".": 3, "+": 2}
+
+    def __init__(self):
+        """ Constructor """
+        self.__size = 0
+        self.__transitions = []
+
+    def get_size(self):
+        """ Getter, number of states """
+        return self.__size
+
+    def get_transitions(self):
+        """ Getter, list of (state_from, token, state_to) """
+        return self.__transitions
+
+    def __new_state(self):
+        """ Allocate one new state """
+        self.__size += 1
+        return self.__size - 1
+
+    def __symbol(self, token):
+        """ Fragment that recognize one token """
+        start = self.__new_state()
+        end = self.__new_state()
+        self.__transitions.append((start, token, end))
+        return (start, end)
+
+    def __apply(self, operator, operands):
+        """ Apply one operator over the fragments of the operands stack """
+
+        if operator == "*":
+            if not operands:
+                raise ValueError("Invalid regular expresion: '*' without operand")
+            inner = operands.pop()
+            start = self.__new_state()
+            end = self.__new_state()
+            self.__transitions.append((start, "", inner[0]))
+            self.__transitions.append((start, "", end))
+            self.__transitions.append((inner[1], "", inner[0]))
+            self.__transitions.append((inner[1], "", end))
+            operands.append((start, end))
+            return
+
+        if len(operands) < 2:
+            raise ValueError("Invalid regular expresion: '{0}' without operand".format(operator))
+
+        right = operands.pop()
+        left = operands.pop()
+
+        if operator == ".":
+            self.__transitions.append((left[1], "", right[0]))
+            operands.append((left[0], right[1]))
+        else:
+            start = self.__new_state()
+            end = self.__new_state()
+            self.__transitions.append((start, "", left[0]))
+            self.__transitions.append((start, "", right[0]))
+            self.__transitions.append((left[1], "", end))
+            self.__transitions.append((right[1], "", end))
+            operands.append((start, end))
+
+    def compile(self, exp):
+        """ Build the fragment of the regular expresion, return (initial, aceptation) """
+
+        if exp == "":
+            return self.__symbol("")
+
+        operands = []
+        operators = []
+        previous = None
+
+        for char in exp:
+
+            # implicit concatenation between one operand and the next one
+            operand_end = previous is not None and previous not in ["+", "(", "."]
+            if operand_end and (char not in Thompson.OPERATORS or char == "("):
+                self.__push_operator(".", operands, operators)
+
+            if char not in Thompson.OPERATORS:
+                operands.append(self.__symbol(char))
+
+            elif char == "*":
+                self.__apply("*", operands)
+
+            elif char == "(":
+                operators.append(("(", len(operands)))
+
+            elif char == ")":
+                while operators and operators[-1][0] != "(":
+                    self.__apply(operators.pop()[0], operands)
+                if not operators:
+                    raise ValueError("Invalid regular expresion: unbalanced ')'")
+                if len(operands) == operators.pop()[1]:
+                    raise ValueError("Invalid regular expresion: empty parentheses")
+
+            else:
+                self.__push_operator(char, operands, operators)
+
+            previous = char
+
+        while operators:
+            operator = operators.pop()[0]
+            if operator == "(":
+                raise ValueError("Invalid regular expresion: unbalanced '('")
+            self.__apply(operator, operands)
+
+        if len(operands) != 1:
+            raise ValueError("Invalid regular expresion")
+
+        return operands[0]
+
+    def __push_operator(self, operator, operands, operators):
+        """ Apply the operators with more or same priority and push the new one """
+        while operators and operators[-1][0] != "(" and \
+              Thompson.PRIORITY[operators[-1][0]] >= Thompson.PRIORITY[operator]:
+            self.__apply(operators.pop()[0], operands)
+        operators.append((operator, len(operands)))
+
+    def numbering(self, initial):
+        """ Return the new number of every state in breadth order from the initial """
+
+        following = [[] for _ in range(self.__size)]
+        for state_from, _, state_to in self.__transitions:
+            following[state_from].append(state_to)
+
+        numbers = [-1] * self.__size
+        numbers[initial] = 0
+        order = [initial]
+        for state in order:
+            for target in following[state]:
+                if numbers[target] == -1:
+                    numbers[target] = len(order)
+                    order.append(target)
+
+        for state in range(self.__size):
+            if numbers[state] == -1:
+                numbers[state] = len(order)
+                order.append(state)
+
+        return numbers
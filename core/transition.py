@@ -8,8 +8,12 @@ import json
 class Transition:
     """
     Class Transition
+    The transitions are immutable, so they can be shared by many automatas
+    and used as keys of one dict or one set, the instances use __slots__
     """
 
+    __slots__ = ("__state_from", "__token", "__state_to")
+
     def __init__(self, one_state_from="", one_token="", one_state_to=""):
         """ Constructor """
 
@@ -21,25 +25,34 @@ class Transition:
         """ Getter """
         return self.__state_from
 
-    def set_state_from(self, one_string):
-        """ Setter """
-        self.__state_from = one_string
-
     def get_token(self):
         """ Getter """
         return self.__token
 
-    def set_token(self, one_string):
-        """ Setter """
-        self.__token = one_string
-
     def get_state_to(self):
         """ Getter """
         return self.__state_to
 
-    def set_state_to(self, one_string):
-        """ Setter """
-        self.__state_to = one_string
+    def __eq__(self, other):
+        if not isinstance(other, Transition):
+            return NotImplemented
+        return self.__state_from == other.get_state_from() and \
+               self.__token == other.get_token() and \
+               self.__state_to == other.get_state_to()
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        return hash((self.__state_from, self.__token, self.__state_to))
+
+    def __repr__(self):
+        return "Transition({0!r}, {1!r}, {2!r})".format(self.__state_from, \
+                                                       self.__token, \
+                                                       self.__state_to)
 
     def to_json(self):
         """ To JSON """
@@ -49,31 +62,32 @@ class Transition:
         _dict['state_to'] = self.__state_to
         return _dict
 
-    def from_json(self, one_jsonx):
-        """ From JSON """
+    def from_json(one_jsonx, *args): # pylint: disable=E0213
+        """
+        From JSON, return the new transition. It is called on the class, the
+        transitions are immutable so one call on one instance (the old way to
+        fill one transition) raises TypeError instead of change nothing
+        """
+        if isinstance(one_jsonx, Transition):
+            raise TypeError("Transition is immutable, use Transition.from_json(json) "
+                            "to create one new transition")
+        if args:
+            raise TypeError("from_json() takes one JSON argument")
+
         one_json = one_jsonx
         if isinstance(one_jsonx, str):
             one_json = json.loads(one_jsonx)
 
-        if 'state_from' in one_json.keys():
-            self.__state_from = one_json['state_from']
-
-        if 'token' in one_json.keys():
-            self.__token = one_json['token']
-
-        if 'state_to' in one_json.keys():
-            self.__state_to = one_json['state_to']
+        return Transition(one_json.get('state_from', ""), \
+                          one_json.get('token', ""), \
+                          one_json.get('state_to', ""))
 
     def replace_name(self, callback):
         """
         Replace names on the states by one given callback
         the callback receive one state name and return the new name
         """
-        new_trans = Transition()
-        new_trans.set_state_to(callback(self.get_state_to()))
-        new_trans.set_state_from(callback(self.get_state_from()))
-        new_trans.set_token(self.get_token())
-        return new_trans
+        return Transition(callback(self.__state_from), self.__token, callback(self.__state_to))
 
     def sort_str(self):
         """ Sort Key """
@@ -83,20 +97,15 @@ class Transition:
 
 
     def copy(self):
-        """ Copy object """
-        def same_callback(str_value):
-            return str_value
-        return self.replace_name(same_callback)
+        """ Copy object, the transitions are immutable so it is the same object """
+        return self
 
     def equal_obj(self, other):
         """ Equal object """
-        if self.get_state_from() == other.get_state_from() and \
-           self.get_state_to() == other.get_state_to() and \
-           self.get_token() == other.get_token():
-            return True
-        return False
+        return self == other
 
     def equal(self, value1, value2, value3):
         """ Equal with value """
-        new_trans = Transition(value1, value2, value3)
-        return self.equal_obj(new_trans)
+        return self.__state_from == value1 and \
+               self.__token == value2 and \
+               self.__state_to == value3
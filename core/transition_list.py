@@ -0,0 +1,373 @@
+#!/usr/bin/python
+"""
+TransitionList class
+"""
+
+from array import array
+try:
+    from collections.abc import MutableSequence
+except ImportError:
+    from collections import MutableSequence
+
+from core.transition import Transition
+from core.symbol_table import SymbolTable
+
+class TransitionList(MutableSequence):
+    """
+    List of transitions stored by columns
+    The states and the tokens are numbered by two SymbolTables and every
+    transition is only three uint32 (state_from, token, state_to) in one
+    array, the Transition objects are created when they are read.
+    The list keeps one index by (state_from, token), by state_from and by
+    state_to, the index is updated on append/remove and rebuilt lazily
+    after any other change
+    The removed transitions are marked in the array and the array is
+    compacted before any access by position
+    One copy shares the array and the index with the original, the array
+    is copied by the first list that changes it (copy on write)
+    """
+
+    DELETED = 0xFFFFFFFF
+
+    def __init__(self, one_iterable=(), states=None, tokens=None):
+        """ Constructor, the symbol tables can be shared with other lists """
+        self.__states = states if states is not None else SymbolTable()
+        self.__tokens = tokens if tokens is not None else SymbolTable()
+        self.__columns = array("I")
+        self.__size = 0
+        self.__dirty = True
+        self.__version = 0
+        self.__by_from_token = {}
+        self.__by_from = {}
+        self.__by_to = {}
+        self.__shared = False
+        if isinstance(one_iterable, TransitionList) and states is None and tokens is None:
+            self.__share(one_iterable)
+        else:
+            self.extend(one_iterable)
+
+    def __share(self, other):
+        """ Use the same array, index and symbol tables of other """
+        other.__shared = True
+        self.__shared = True
+        self.__states = other.__states
+        self.__tokens = other.__tokens
+        self.__columns = other.__columns
+        self.__size = other.__size
+        self.__dirty = other.__dirty
+        self.__by_from_token = other.__by_from_token
+        self.__by_from = other.__by_from
+        self.__by_to = other.__by_to
+
+    def __unshare(self):
+        """ Copy the shared array before change it, the index is rebuilt later """
+        if self.__shared:
+            self.__columns = array("I", self.__columns)
+            self.__dirty = True
+            self.__shared = False
+
+    def copy(self):
+        """ Return one new list that shares the content until one of them changes """
+        return TransitionList(self)
+
+    @staticmethod
+    def from_columns(columns, states, tokens):
+        """
+        Return one list over one read-only buffer of uint32 triples (like one
+        view of one mapped file) without copy it, the numbers are of the
+        symbol tables states and tokens. The buffer is copied to one array by
+        the first change of the list
+        """
+        transitions = TransitionList(states=states, tokens=tokens)
+        transitions.__columns = columns
+        transitions.__size = len(columns) // 3
+        transitions.__shared = True
+        return transitions
+
+    def __transition(self, position):
+        """ Create the transition saved on position """
+        columns = self.__columns
+        state = self.__states.name
+        return Transition(state(columns[position]),
+                          self.__tokens.name(columns[position + 1]),
+                          state(columns[position + 2]))
+
+    def __index_add(self, position):
+        """ Add the transition on position to the index """
+        columns = self.__columns
+        state_from = columns[position]
+        self.__by_from_token.setdefault((state_from, columns[position + 1]), []).append(position)
+        self.__by_from.setdefault(state_from, []).append(position)
+        self.__by_to.setdefault(columns[position + 2], []).append(position)
+
+    def __index_remove(self, position):
+        """ Remove the transition on position from the index """
+        columns = self.__columns
+        key = (columns[position], columns[position + 1])
+        for index, value in [(self.__by_from_token, key),
+                             (self.__by_from, columns[position]),
+                             (self.__by_to, columns[position + 2])]:
+            bucket = index[value]
+            bucket.remove(position)
+            if not bucket:
+                del index[value]
+
+    def __rebuild(self):
+        """ Build again the index from the content of the list """
+        self.__by_from_token = {}
+        self.__by_from = {}
+        self.__by_to = {}
+        columns = self.__columns
+        for position in range(0, len(columns), 3):
+            if columns[position] != TransitionList.DELETED:
+                self.__index_add(position)
+        self.__dirty = False
+
+    def __touch(self):
+        """ Mark the index to be rebuild on the next fetch """
+        self.__dirty = True
+        self.__version += 1
+
+    def __compact(self):
+        """ Remove the marks of the removed transitions from the array """
+        columns = self.__columns
+        if len(columns) == 3 * self.__size:
+            return
+        compact = array("I")
+        for position in range(0, len(columns), 3):
+            if columns[position] != TransitionList.DELETED:
+                compact.extend(columns[position:position + 3])
+        self.__columns = compact
+        self.__shared = False
+        self.__dirty = True
+
+    def __position(self, index):
+        """ Return the position in the array of one index of the list """
+        self.__compact()
+        if index < 0:
+            index += self.__size
+        if not 0 <= index < self.__size:
+            raise IndexError("TransitionList index out of range")
+        return 3 * index
+
+    def __load(self, transitions):
+        """ Replace the content of the list by the transitions """
+        self.__columns = array("I")
+        self.__shared = False
+        self.__size = 0
+        self.__touch()
+        self.extend(transitions)
+
+    def get_version(self):
+        """ Getter, the version changes on every change of the list """
+        return self.__version
+
+    def get_states_table(self):
+        """ Getter, SymbolTable of the states """
+        return self.__states
+
+    def get_tokens_table(self):
+        """ Getter, SymbolTable of the tokens """
+        return self.__tokens
+
+    def iterate_numbers(self):
+        """ Iterate the transitions as (state_from, token, state_to) numbers """
+        columns = self.__columns
+        for position in range(0, len(columns), 3):
+            if columns[position] != TransitionList.DELETED:
+                yield (columns[position], columns[position + 1], columns[position + 2])
+
+    def append_numbers(self, state_from, token, state_to):
+        """ Append one transition given by the numbers of its symbol tables """
+        self.__unshare()
+        columns = self.__columns
+        columns.append(state_from)
+        columns.append(token)
+        columns.append(state_to)
+        self.__size += 1
+        self.__version += 1
+        if not self.__dirty:
+            self.__index_add(len(columns) - 3)
+
+    def __len__(self):
+        return self.__size
+
+    def __iter__(self):
+        columns = self.__columns
+        position = 0
+        while position < len(self.__columns):
+            if self.__columns is not columns:
+                raise RuntimeError("TransitionList changed during iteration")
+            if columns[position] != TransitionList.DELETED:
+                yield self.__transition(position)
+            position += 3
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        return self.__transition(self.__position(index))
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            transitions = list(self)
+            transitions[index] = value
+            self.__load(transitions)
+            return
+        position = self.__position(index)
+        self.__unshare()
+        self.__columns[position] = self.__states.number(value.get_state_from())
+        self.__columns[position + 1] = self.__tokens.number(value.get_token())
+        self.__columns[position + 2] = self.__states.number(value.get_state_to())
+        self.__touch()
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            transitions = list(self)
+            del transitions[index]
+            self.__load(transitions)
+            return
+        position = self.__position(index)
+        self.__unshare()
+        del self.__columns[position:position + 3]
+        self.__size -= 1
+        self.__touch()
+
+    def __contains__(self, trans):
+        if not isinstance(trans, Transition):
+            return False
+        return bool(self.fetch(trans.get_state_from(), trans.get_token(), trans.get_state_to()))
+
+    def __eq__(self, other):
+        if not isinstance(other, (TransitionList, list)):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __add__(self, one_iterable):
+        new_list = TransitionList(self)
+        new_list.extend(one_iterable)
+        return new_list
+
+    def __radd__(self, one_iterable):
+        new_list = TransitionList(one_iterable)
+        new_list.extend(self)
+        return new_list
+
+    def __iadd__(self, one_iterable):
+        self.extend(one_iterable)
+        return self
+
+    def __repr__(self):
+        return "TransitionList({0!r})".format(list(self))
+
+    def append(self, trans):
+        self.append_numbers(self.__states.number(trans.get_state_from()),
+                            self.__tokens.number(trans.get_token()),
+                            self.__states.number(trans.get_state_to()))
+
+    def extend(self, one_iterable):
+        if one_iterable is self:
+            one_iterable = list(one_iterable)
+        for trans in one_iterable:
+            self.append(trans)
+
+    def insert(self, index, trans):
+        self.__compact()
+        self.__unshare()
+        if index < 0:
+            index = max(0, index + self.__size)
+        position = 3 * min(index, self.__size)
+        self.__columns[position:position] = array("I", [self.__states.number(trans.get_state_from()),
+                                                        self.__tokens.number(trans.get_token()),
+                                                        self.__states.number(trans.get_state_to())])
+        self.__size += 1
+        self.__touch()
+
+    def remove(self, trans):
+        self.__unshare()
+        columns = self.__columns
+        state_from = self.__states.find(trans.get_state_from())
+        token = self.__tokens.find(trans.get_token())
+        state_to = self.__states.find(trans.get_state_to())
+
+        if self.__dirty:
+            candidates = range(0, len(columns), 3)
+        else:
+            candidates = self.__by_from_token.get((state_from, token), [])
+
+        for position in candidates:
+            if columns[position] == state_from and columns[position + 1] == token and \
+               columns[position + 2] == state_to:
+                break
+        else:
+            raise ValueError("TransitionList.remove(x): x not in list")
+
+        if not self.__dirty:
+            self.__index_remove(position)
+        columns[position] = TransitionList.DELETED
+        self.__size -= 1
+        self.__version += 1
+
+        # Compact when there are more removed transitions than live transitions
+        if len(columns) > 6 * self.__size + 192:
+            self.__compact()
+
+    def clear(self):
+        self.__columns = array("I")
+        self.__shared = False
+        self.__size = 0
+        self.__touch()
+
+    def sort(self, key=None, reverse=False):
+        transitions = list(self)
+        transitions.sort(key=key, reverse=reverse)
+        self.__load(transitions)
+
+    def reverse(self):
+        self.__load(reversed(list(self)))
+
+    def fetch(self, state_from=None, token=None, state_to=None):
+        """ Fetch a list of transitions passing the state_from, token or state_to """
+
+        if self.__dirty:
+            self.__rebuild()
+
+        numbers = []
+        for name, table in [(state_from, self.__states), (token, self.__tokens),
+                            (state_to, self.__states)]:
+            number = None
+            if name is not None:
+                number = table.find(name)
+                if number is None:
+                    return []
+            numbers.append(number)
+        state_from, token, state_to = numbers
+
+        if state_from is not None and token is not None:
+            found = self.__by_from_token.get((state_from, token), [])
+        elif state_from is not None:
+            found = self.__by_from.get(state_from, [])
+        elif state_to is not None:
+            found = self.__by_to.get(state_to, [])
+        elif token is not None:
+            columns = self.__columns
+            found = [position for position in range(0, len(columns), 3)
+                     if columns[position + 1] == token and
+                     columns[position] != TransitionList.DELETED]
+        else:
+            return list(self)
+
+        columns = self.__columns
+        if state_to is not None and state_from is not None:
+            found = [position for position in found if columns[position + 2] == state_to]
+        elif token is not None and state_from is None and state_to is not None:
+            found = [position for position in found if columns[position + 1] == token]
+
+        return [self.__transition(position) for position in found]
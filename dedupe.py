@@ -0,0 +1,56 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Regular expresion de-duplication script
+"""
+
+import argparse
+import json
+import sys
+
+from core.dedupe import Deduplicator
+
+def main():
+    """ Parse the arguments and group the expresions of the file by language """
+
+    parser = argparse.ArgumentParser(description="Group the regular expresions of one file "
+                                                 "(one by line) by the language they accept")
+    parser.add_argument("filename", help="file with one regular expresion by line")
+    parser.add_argument("--workers", type=int, help="number of processes (default the cores)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="expresions by task")
+    parser.add_argument("--all", action="store_true", help="print the groups of one expresion")
+    parser.add_argument("--json", action="store_true", help="print the groups as JSON")
+    args = parser.parse_args()
+
+    # Keep the line number of every expresion, the empty lines are skipped
+    lines = []
+    expresions = []
+    with open(args.filename, encoding="utf-8") as filex:
+        for number, line in enumerate(filex, 1):
+            line = line.strip()
+            if line:
+                lines.append(number)
+                expresions.append(line)
+
+    groups, errors = Deduplicator(args.workers, args.chunk_size).group(expresions)
+
+    for index, message in sorted(errors.items()):
+        sys.stderr.write("line {0}: {1}\n".format(lines[index], message))
+
+    if not args.all:
+        groups = [members for members in groups if len(members) > 1]
+
+    if args.json:
+        print(json.dumps([[{"line": lines[index], "expresion": expresions[index]}
+                           for index in members] for members in groups], indent=4))
+    else:
+        for number, members in enumerate(groups, 1):
+            print("group {0} ({1} expresions)".format(number, len(members)))
+            for index in members:
+                print("    {0}: {1}".format(lines[index], expresions[index]))
+
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,7 @@ import sys
 
 from core.automata import Automata
 from core.automata import Transition
+from core.expresion_cache import EXPRESION_CACHE
 
 def xinput(string):
     """
@@ -161,9 +162,12 @@ class App:
         if option == "X":
             print("Create from Regex")
             regex = xinput("Insert the regex: ")
-            self.__auto = Automata.read_expresion(regex)
-            self.__auto.console_print()
-            self.__loaded = True
+            try:
+                self.__auto = EXPRESION_CACHE.get(regex)
+                self.__auto.console_print()
+                self.__loaded = True
+            except ValueError as error:
+                print(error)
 
     def multi_tasks(self, option):
         """
@@ -177,15 +181,17 @@ class App:
             one = xinput("Insert the first regular expresion:  ")
             two = xinput("Insert the second regular expresion: ")
 
-            auto1 = Automata.read_expresion(one)
-            auto2 = Automata.read_expresion(two)
-
             try:
-                auto3 = Automata.merge_automata(auto1, auto2, "equiv")
-                print("\n*** Regular Expresions ARE equivalent ***\n")
+                auto1 = EXPRESION_CACHE.get(one)
+                auto2 = EXPRESION_CACHE.get(two)
+                counterexample = Automata.find_counterexample(auto1, auto2)
+                if counterexample is None:
+                    print("\n*** Regular Expresions ARE equivalent ***\n")
+                else:
+                    print("\n*** Regular Expresions are NOT equivalent ***")
+                    print("Counterexample: '{0}'\n".format(counterexample))
             except ValueError as error:
-                print("\n*** Regular Expresions are NOT equivalent ***")
-                print(str(error) + '\n')
+                print(error)
 
         if option in ["I", "U", "Y"]:
 
@@ -0,0 +1,121 @@
+#!/usr/bin/python
+"""
+Tests of the Automata class
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from core.automata import Automata
+from core.binary import BinaryAutomata
+from core.hopcroft import Hopcroft
+from core.transition import Transition
+
+class TestAutomata(unittest.TestCase):
+    """
+    Edge cases of the deterministic and minimized automatas and the
+    caches of the compiled engines
+    """
+
+    def test_empty_alphabet(self):
+        deterministic = Automata.read_expresion("").to_deterministic()
+        self.assertEqual(deterministic.get_states(), [deterministic.get_initial()])
+        for method in ["hopcroft", "pairs"]:
+            minimal = deterministic.minimizete(method)
+            self.assertEqual(minimal.get_states(), [minimal.get_initial()])
+            self.assertTrue(minimal.evaluate(""))
+            self.assertFalse(minimal.evaluate("a"))
+
+    def test_empty_partition(self):
+        self.assertEqual(Hopcroft(0, 0, [], set()).blocks(), [])
+        self.assertEqual(Hopcroft(1, 0, [], set([0])).blocks(), [[0]])
+
+    def test_compile_cache(self):
+        automata = Automata.read_expresion("(a+b)*a")
+        matcher = automata.compile()
+        self.assertIs(automata.compile(), matcher)
+        self.assertIs(automata.simulation("dfa"), matcher)
+        self.assertTrue(automata.evaluate("ba", engine="dfa"))
+
+        # One new transition, one new aceptation and one new initial
+        automata.get_transitions().append(Transition(automata.get_initial(), "c", "end"))
+        automata.build_alphabet()
+        self.assertIsNot(automata.compile(), matcher)
+        self.assertFalse(automata.evaluate("c", engine="dfa"))
+        automata.get_aceptation().append("end")
+        self.assertTrue(automata.evaluate("c", engine="dfa"))
+        automata.set_initial("end")
+        self.assertTrue(automata.evaluate("", engine="dfa"))
+        self.assertFalse(automata.evaluate("a", engine="dfa"))
+
+        # auto only uses the Matcher when the automata is deterministic
+        deterministic = automata.to_deterministic()
+        self.assertIs(deterministic.simulation("auto"), deterministic.compile())
+        self.assertIsNot(automata.simulation("auto"), automata.compile())
+
+    def test_evaluate_many_cache(self):
+        automata = Automata.read_expresion("(a+b)*a(a+b)")
+        batches = [["aa", "ab"], ["b", "ba", ""], ["aab"]]
+        expected = [[automata.evaluate(x) for x in batch] for batch in batches]
+        matcher = automata.compile()
+        for batch, result in zip(batches, expected):
+            self.assertEqual([bool(x) for x in automata.evaluate_many(batch)], result)
+        self.assertIs(automata.compile(), matcher)
+
+    def test_lazy_cache(self):
+        automata = Automata.read_expresion("(a+b)*a(a+b)")
+        engine = automata.simulation("lazy")
+        self.assertIs(automata.lazy_engine(), engine)
+        self.assertTrue(automata.evaluate("bab", engine="lazy"))
+        self.assertFalse(automata.evaluate("bba", engine="lazy"))
+        self.assertGreater(engine.stats()["hits"], 0)
+
+        # Other limits or one change of the automata build one new LazyDFA
+        small = automata.simulation("lazy", max_states=2)
+        self.assertIsNot(small, engine)
+        self.assertTrue(automata.evaluate("bab", engine="lazy", max_states=2))
+        self.assertLessEqual(small.stats()["states"], 2)
+        automata.set_aceptation([])
+        self.assertFalse(automata.evaluate("bab", engine="lazy", max_states=2))
+
+    def test_binary_mapping(self):
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, "automata.autb")
+            automata = Automata.read_expresion("(a+b)*a(a+b)").to_deterministic()
+            automata.to_binary(filename, table=True)
+
+            # The names with commas of the subset construction are kept
+            loaded = Automata()
+            loaded.from_binary(filename)
+            self.assertEqual(loaded.evaluate("bab", engine="bitset"), True)
+            self.assertEqual(loaded.to_json(), automata.to_json())
+
+            # The first change copies the mapped transitions
+            loaded.get_transitions().append(Transition(loaded.get_initial(), "c", "end"))
+            self.assertEqual(len(loaded.get_transitions()), len(automata.get_transitions()) + 1)
+            again = Automata()
+            again.from_binary(filename)
+            self.assertEqual(again.to_json(), automata.to_json())
+
+            with BinaryAutomata(filename) as binary:
+                matcher = pickle.loads(pickle.dumps(binary.matcher()))
+            self.assertEqual([matcher.match(x) for x in ["bab", "bba", "aa"]],
+                             [True, False, True])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_transition_from_json(self):
+        data = {"state_from": "q0", "token": "a", "state_to": "q1"}
+        self.assertEqual(Transition.from_json(data), Transition("q0", "a", "q1"))
+        self.assertEqual(Transition.from_json('{"token": "b"}'), Transition("", "b", ""))
+
+        # The old mutating call must to fail instead of keep one empty transition
+        with self.assertRaises(TypeError):
+            Transition().from_json(data)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,319 @@
+#!/usr/bin/python
+"""
+Differential tests of the evaluation engines over random automatas
+Every engine is compared with one plain simulation written here over
+the list of transitions and one BFS for the epsilon cerradure
+"""
+
+import itertools
+import os
+import random
+import re
+import shutil
+import tempfile
+import unittest
+
+from core.automata import Automata
+from core.binary import BinaryAutomata
+from core.closure import EpsilonClosure
+from core.families import Families
+from core.lexer import Lexer
+from core.pattern_set import PatternSet
+
+SEEDS = range(20)
+
+def random_automatas():
+    """ Return (seed, automata) of small random NFAs with epsilon transitions """
+    return [(seed, Families.random_nfa(4 + seed % 9, density=0.4, epsilon_ratio=0.3, seed=seed))
+            for seed in SEEDS]
+
+def random_expresion(generator, depth):
+    """ Return one random regular expresion over "ab" """
+    if depth == 0 or generator.random() < 0.3:
+        return generator.choice("ab")
+    kind = generator.random()
+    if kind < 0.35:
+        return random_expresion(generator, depth - 1) + random_expresion(generator, depth - 1)
+    if kind < 0.7:
+        return "({0}+{1})".format(random_expresion(generator, depth - 1),
+                                  random_expresion(generator, depth - 1))
+    return "({0})*".format(random_expresion(generator, depth - 1))
+
+def python_regex(exp):
+    """ Translate one expresion of read_expresion to the syntax of re """
+    return re.compile(exp.replace("+", "|").replace(".", ""))
+
+def successors(automata):
+    """ Dict (state, token) -> set of states read from the list of transitions """
+    table = {}
+    for trans in automata.get_transitions():
+        table.setdefault((trans.get_state_from(), trans.get_token()), set()).add(
+            trans.get_state_to())
+    return table
+
+def cerradure(table, states):
+    """ Epsilon cerradure of one set of state names with one BFS """
+    pending = list(states)
+    closed = set(states)
+    while pending:
+        for state in table.get((pending.pop(), ""), ()):
+            if state not in closed:
+                closed.add(state)
+                pending.append(state)
+    return closed
+
+def reference(automata, one_string):
+    """ Plain simulation of the automata with sets of names """
+    table = successors(automata)
+    states = cerradure(table, [automata.get_initial()])
+    for token in one_string:
+        following = set()
+        for state in states:
+            following |= table.get((state, token), set())
+        states = cerradure(table, following)
+    return bool(states & set(automata.get_aceptation()))
+
+def product_equivalent(automata1, automata2):
+    """
+    Explore the pairs of states of both deterministic automatas (None when
+    one automata has not transition) and check that they agree on aceptation
+    """
+
+    automata1 = automata1.to_deterministic()
+    automata2 = automata2.to_deterministic()
+    tables = [successors(automata1), successors(automata2)]
+    finals = [set(automata1.get_aceptation()), set(automata2.get_aceptation())]
+    alphabet = set(automata1.get_alphabet()) | set(automata2.get_alphabet())
+    alphabet.discard("")
+
+    start = (automata1.get_initial(), automata2.get_initial())
+    pending = [start]
+    seen = set(pending)
+    while pending:
+        pair = pending.pop()
+        if (pair[0] in finals[0]) != (pair[1] in finals[1]):
+            return False
+        for token in alphabet:
+            following = tuple(next(iter(tables[i].get((pair[i], token), [None])))
+                              for i in range(2))
+            if following not in seen:
+                seen.add(following)
+                pending.append(following)
+    return True
+
+def strings(seed, count=60, length=10):
+    """ Random strings over "abc", c is out of the alphabet """
+    return [""] + Families.strings("abc", count, length, seed=seed)
+
+
+class TestEngines(unittest.TestCase):
+    """
+    Every engine gives the same result as the reference simulation
+    """
+
+    def test_fetch_transition(self):
+        for seed, automata in random_automatas():
+            transitions = list(automata.get_transitions())
+            with self.subTest(seed=seed):
+                for state in automata.get_states():
+                    for token in automata.get_alphabet():
+                        expected = sorted(x.get_state_to() for x in transitions
+                                          if x.get_state_from() == state and \
+                                             x.get_token() == token)
+                        result = sorted(x.get_state_to()
+                                        for x in automata.fetch_transition(state, token))
+                        self.assertEqual(result, expected)
+
+    def test_simulations(self):
+        for seed, automata in random_automatas():
+            expected = [reference(automata, one_string) for one_string in strings(seed)]
+            for engine in ["set", "bitset", "lazy", "dfa", "auto"]:
+                with self.subTest(seed=seed, engine=engine):
+                    result = [automata.evaluate(one_string, engine=engine)
+                              for one_string in strings(seed)]
+                    self.assertEqual(result, expected)
+
+    def test_matcher(self):
+        for seed, automata in random_automatas():
+            expected = [reference(automata, one_string) for one_string in strings(seed)]
+            matcher = automata.compile()
+            with self.subTest(seed=seed):
+                self.assertEqual([matcher.match(x) for x in strings(seed)], expected)
+                self.assertEqual([bool(x) for x in matcher.match_many(strings(seed))], expected)
+                self.assertEqual([bool(x) for x in automata.evaluate_many(strings(seed))],
+                                 expected)
+
+    def test_cursor(self):
+        for seed, automata in random_automatas():
+            for engine in ["set", "bitset", "lazy", "dfa"]:
+                with self.subTest(seed=seed, engine=engine):
+                    for one_string in strings(seed, 20):
+                        cursor = automata.cursor(engine=engine)
+                        for i in range(0, len(one_string), 3):
+                            cursor.feed(one_string[i:i + 3])
+                        self.assertEqual(cursor.accepting(), reference(automata, one_string))
+
+    def test_epsilon_closure(self):
+        for seed, automata in random_automatas():
+            closures = automata.epsilon_closures()
+            table = successors(automata)
+            with self.subTest(seed=seed):
+                for state in automata.get_states():
+                    self.assertEqual(set(closures[state]), cerradure(table, [state]))
+
+        # One cycle and one chain: 0 -> 1 -> 2 -> 0, 2 -> 3
+        closure = EpsilonClosure(5, [[1], [2], [0, 3], [], []])
+        self.assertEqual(closure.closure(0), [0, 1, 2, 3])
+        self.assertEqual(closure.closure(3), [3])
+        self.assertEqual(closure.closure(4), [4])
+
+    def test_thompson(self):
+        generator = random.Random(1)
+        for _ in range(80):
+            exp = random_expresion(generator, 4)
+            automata = Automata.read_expresion(exp)
+            regex = python_regex(exp)
+            with self.subTest(exp=exp):
+                for length in range(6):
+                    for one_string in map("".join, itertools.product("ab", repeat=length)):
+                        self.assertEqual(automata.evaluate(one_string),
+                                         regex.fullmatch(one_string) is not None)
+
+    def test_deterministic(self):
+        for seed, automata in random_automatas():
+            deterministic = automata.to_deterministic()
+            with self.subTest(seed=seed):
+                self.assertTrue(deterministic.is_deterministic())
+                for one_string in strings(seed):
+                    self.assertEqual(reference(deterministic, one_string),
+                                     reference(automata, one_string))
+
+    def test_minimize(self):
+        for seed, automata in random_automatas():
+            deterministic = automata.to_deterministic()
+            hopcroft = deterministic.minimizete("hopcroft")
+            pairs = deterministic.minimizete("pairs")
+            with self.subTest(seed=seed):
+                self.assertEqual(len(hopcroft.get_states()), len(pairs.get_states()))
+                self.assertIsNone(Automata.find_counterexample(hopcroft, pairs))
+                for one_string in strings(seed):
+                    expected = reference(automata, one_string)
+                    self.assertEqual(reference(hopcroft, one_string), expected)
+                    self.assertEqual(reference(pairs, one_string), expected)
+
+    def test_equivalence(self):
+        automatas = [automata for _, automata in random_automatas()]
+        for automata1, automata2 in itertools.combinations(automatas[:10], 2):
+            counterexample = Automata.find_counterexample(automata1, automata2)
+            self.assertEqual(counterexample is None, product_equivalent(automata1, automata2))
+            if counterexample is not None:
+                self.assertNotEqual(reference(automata1, counterexample),
+                                    reference(automata2, counterexample))
+            self.assertIsNone(Automata.find_counterexample(automata1,
+                                                           automata1.to_deterministic()))
+
+    def test_product(self):
+        for seed, automata in random_automatas()[:10]:
+            other = random_automatas()[(seed + 1) % len(SEEDS)][1]
+            union = Automata.merge_automata(automata, other, "union")
+            intersection = Automata.merge_automata(automata, other, "intersection", prune=True)
+            with self.subTest(seed=seed):
+                for one_string in strings(seed):
+                    left = reference(automata, one_string)
+                    right = reference(other, one_string)
+                    self.assertEqual(reference(union, one_string), left or right)
+                    self.assertEqual(reference(intersection, one_string), left and right)
+
+    def test_files(self):
+        directory = tempfile.mkdtemp()
+        try:
+            for seed, automata in random_automatas()[:8]:
+                json_name = os.path.join(directory, "{0}.json".format(seed))
+                automata.to_file(json_name)
+                loaded_json = Automata()
+                loaded_json.from_filename(json_name, validate=True)
+                with self.subTest(seed=seed, format="json"):
+                    self.assertEqual(loaded_json.to_json(), automata.to_json())
+
+                binary_name = os.path.join(directory, "{0}.autb".format(seed))
+                automata.to_binary(binary_name)
+                loaded_binary = Automata()
+                loaded_binary.from_filename(binary_name)
+                with self.subTest(seed=seed, format="binary"):
+                    self.assertEqual(loaded_binary.to_json(), automata.to_json())
+                    for one_string in strings(seed):
+                        self.assertEqual(reference(loaded_binary, one_string),
+                                         reference(automata, one_string))
+
+                # The table of the matcher is only saved for deterministic automatas
+                deterministic = automata.to_deterministic()
+                deterministic.to_binary(binary_name, table=True)
+                with BinaryAutomata(binary_name) as binary:
+                    matcher = binary.matcher()
+                    for one_string in strings(seed):
+                        self.assertEqual(matcher.match(one_string),
+                                         reference(automata, one_string))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_pattern_set(self):
+        generator = random.Random(2)
+        patterns = [random_expresion(generator, 3) for _ in range(30)]
+        automatas = [Automata.read_expresion(pattern) for pattern in patterns]
+        for max_states in [2, 10000]:
+            pattern_set = PatternSet(patterns, max_states)
+            for one_string in strings(3, 200):
+                expected = tuple(i for i, automata in enumerate(automatas)
+                                 if reference(automata, one_string))
+                self.assertEqual(pattern_set.match(one_string), expected)
+
+    def test_search(self):
+        generator = random.Random(3)
+        for _ in range(60):
+            exp = random_expresion(generator, 3)
+            automata = Automata.read_expresion(exp)
+            regex = python_regex(exp)
+            for text in strings(generator.randint(0, 1000), 5, 14):
+
+                # Leftmost-longest spans without empty matches, by brute force
+                expected = []
+                position = 0
+                while position < len(text):
+                    span = None
+                    for start in range(position, len(text)):
+                        for end in range(len(text), start, -1):
+                            if regex.fullmatch(text, start, end):
+                                span = (start, end)
+                                break
+                        if span:
+                            break
+                    if span is None:
+                        break
+                    expected.append(span)
+                    position = span[1]
+
+                with self.subTest(exp=exp, text=text):
+                    self.assertEqual(list(automata.finditer(text)), expected)
+                    self.assertEqual(automata.searcher(2).findall(text), expected)
+
+        # One forward run from every start would read until the end of the text
+        automata = Automata.read_expresion("a(a)*b+a")
+        self.assertEqual(automata.searcher().findall("a" * 5000 + "b"), [(0, 5001)])
+        self.assertEqual(len(automata.searcher().findall("a" * 5000)), 5000)
+
+    def test_lexer(self):
+        rules = [("if", "if"), ("name", "(i+f+x)(i+f+x+0+1)*"), ("number", "(0+1)(0+1)*"),
+                 ("space", "  *"), ("equal", "="), ("equal2", "==")]
+        lexer = Lexer(rules, ignore=["space"])
+        text = "if iff x1=10 ==x = if0"
+        expected = [("if", "if", 0), ("name", "iff", 3), ("name", "x1", 7), ("equal", "=", 9),
+                    ("number", "10", 10), ("equal2", "==", 13), ("name", "x", 15),
+                    ("equal", "=", 17), ("name", "if0", 19)]
+        self.assertEqual(list(lexer.tokenize(text)), expected)
+        chunks = [text[i:i + 2] for i in range(0, len(text), 2)]
+        self.assertEqual(list(lexer.tokenize_chunks(chunks)), expected)
+        with self.assertRaises(ValueError):
+            list(lexer.tokenize("x = ?"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+#!/usr/bin/python
+"""
+Tests of the Equivalence class
+"""
+
+import glob
+import os
+import unittest
+
+from core.automata import Automata
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "data")
+
+class TestEquivalence(unittest.TestCase):
+    """
+    Every automata of data/ is equivalent to its copy and its minimized form
+    """
+
+    def test_data_copies(self):
+        for filename in sorted(glob.glob(os.path.join(DATA, "*.json"))):
+            automata = Automata()
+            automata.from_filename(filename)
+            with self.subTest(filename=filename):
+                self.assertIsNone(Automata.find_counterexample(automata, automata.copy()))
+                minimal = automata.to_deterministic().minimizete()
+                self.assertIsNone(Automata.find_counterexample(automata, minimal))
+                Automata.merge_automata(automata, minimal, "equiv")
+
+    def test_counterexample(self):
+        automata1 = Automata.read_expresion("(a+b)*a")
+        automata2 = Automata.read_expresion("(a+b)*b")
+        self.assertEqual(Automata.find_counterexample(automata1, automata2), "a")
+        self.assertRaises(ValueError, Automata.merge_automata, automata1, automata2, "equiv")
+
+if __name__ == "__main__":
+    unittest.main()